@@ -0,0 +1,179 @@
+# backend/bench/__main__.py
+"""
+Banc de charge reproductible.
+
+    python -m Back.bench generate --scale small --url postgresql://...   # jeu de données
+    python -m Back.bench run --url postgresql://... --out avant.json      # trafic + rapport
+    python -m Back.bench compare avant.json apres.json                   # comparaison
+    python -m Back.bench serialization --url postgresql://...            # RESPONSE_MODE standard vs fast
+    python -m Back.bench explain --url postgresql://...                  # filtres chauds sur index ?
+
+--url peut aussi désigner une base SQLite (sqlite:///bench.db) pour un essai local.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+
+def _use_database(url: str):
+    # doit précéder tout import de Back.database
+    if url:
+        os.environ["DATABASE_URL"] = url
+
+
+def cmd_generate(args):
+    _use_database(args.url)
+    from .. import database, models  # noqa: F401  (enregistre les tables)
+    from .generator import SCALES, generate
+
+    if args.reset:
+        database.Base.metadata.drop_all(bind=database.engine)
+    database.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    try:
+        if db.query(models.User.id).first() is not None:
+            sys.exit("La base contient déjà des données (utiliser --reset pour la vider)")
+        generate(db, SCALES[args.scale], seed=args.seed)
+    finally:
+        db.close()
+
+
+def cmd_run(args):
+    _use_database(args.url)
+    from .. import database
+    from ..main import app
+    from . import driver, report
+
+    driver.install_query_counter(database.engine)
+    if database.async_engine is not None:
+        driver.install_query_counter(database.async_engine.sync_engine)
+    db = database.SessionLocal()
+    try:
+        fixture = driver.load_fixture(db)
+    finally:
+        db.close()
+    if not fixture.categories or not fixture.jury_emails:
+        sys.exit("Base vide : lancer d'abord `python -m Back.bench generate`")
+
+    bench = driver.Driver(app, fixture, concurrency=args.concurrency, seed=args.seed)
+    print(f"Trafic : {args.logins} connexions, {args.writes} saisies, {args.reads} lectures "
+          f"(concurrence {args.concurrency})")
+    wall = asyncio.run(bench.run([
+        ("login_storm", bench.login_storm(args.logins)),
+        ("score_entry", bench.score_entry(args.writes)),
+        ("leaderboard", bench.leaderboard(args.reads)),
+        ("listing", bench.listing(args.reads // 10)),
+    ]))
+
+    meta = {
+        "label": args.label,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "dialect": database.engine.dialect.name,
+        "db_mode": database.DB_MODE,
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+    }
+    result = report.summarize(bench.samples, wall, meta)
+    print(report.format_table(result))
+    if args.out:
+        report.save(result, args.out)
+        print(f"Rapport écrit dans {args.out}")
+
+
+def cmd_serialization(args):
+    """Mêmes lectures, rejouées en RESPONSE_MODE=standard puis fast (caches vidés entre les deux)"""
+    _use_database(args.url)
+    from .. import database
+    from ..main import app
+    from ..utils import cache, serialization
+    from . import driver, report
+
+    driver.install_query_counter(database.engine)
+    db = database.SessionLocal()
+    try:
+        fixture = driver.load_fixture(db)
+    finally:
+        db.close()
+    if not fixture.categories:
+        sys.exit("Base vide : lancer d'abord `python -m Back.bench generate`")
+
+    results = {}
+    for mode in ("standard", "fast"):
+        serialization.RESPONSE_MODE = mode
+        cache.clear_all()
+        bench = driver.Driver(app, fixture, concurrency=1, seed=args.seed)
+        print(f"RESPONSE_MODE={mode}")
+        wall = asyncio.run(bench.run([
+            ("leaderboard", bench.leaderboard(args.reads)),
+            ("listing", bench.listing(args.reads // 5)),
+        ]))
+        results[mode] = report.summarize(bench.samples, wall, {"response_mode": mode})
+    print(report.compare(results["standard"], results["fast"]))
+
+
+def cmd_explain(args):
+    _use_database(args.url)
+    from .. import database
+    from . import explain
+
+    db = database.SessionLocal()
+    try:
+        ok = explain.check(db)
+    finally:
+        db.close()
+    if not ok:
+        sys.exit("Requête chaude sans son index (index manquant ? python -m Back.migrations)")
+
+
+def cmd_compare(args):
+    from . import report
+    print(report.compare(report.load(args.before), report.load(args.after)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Back.bench")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Génère un jeu de données synthétique")
+    gen.add_argument("--scale", choices=["tiny", "small", "medium", "large"], default="small")
+    gen.add_argument("--url", help="DATABASE_URL cible (défaut : variable d'environnement)")
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--reset", action="store_true", help="Supprime et recrée toutes les tables")
+    gen.set_defaults(func=cmd_generate)
+
+    run = sub.add_parser("run", help="Rejoue le trafic et produit un rapport")
+    run.add_argument("--url", help="DATABASE_URL cible (défaut : variable d'environnement)")
+    run.add_argument("--logins", type=int, default=200)
+    run.add_argument("--writes", type=int, default=2000)
+    run.add_argument("--reads", type=int, default=2000)
+    run.add_argument("--concurrency", type=int, default=20)
+    run.add_argument("--seed", type=int, default=7)
+    run.add_argument("--label", default="")
+    run.add_argument("--out", help="Fichier JSON du rapport")
+    run.set_defaults(func=cmd_run)
+
+    ser = sub.add_parser("serialization", help="Compare les modes de réponse standard et fast")
+    ser.add_argument("--url", help="DATABASE_URL cible (défaut : variable d'environnement)")
+    ser.add_argument("--reads", type=int, default=500)
+    ser.add_argument("--seed", type=int, default=7)
+    ser.set_defaults(func=cmd_serialization)
+
+    exp = sub.add_parser("explain", help="Vérifie que les requêtes chaudes utilisent un index")
+    exp.add_argument("--url", help="DATABASE_URL cible (défaut : variable d'environnement)")
+    exp.set_defaults(func=cmd_explain)
+
+    cmp_ = sub.add_parser("compare", help="Compare deux rapports JSON")
+    cmp_.add_argument("before")
+    cmp_.add_argument("after")
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# backend/bench/driver.py
+"""
+Rejoue un trafic de session réaliste contre l'application FastAPI, en mémoire
+(httpx + ASGITransport, sans serveur ni réseau), lifespan compris (index de
+validation, tampon d'écriture, écoute des invalidations, échantillonneur) :
+
+- login_storm : tous les jurys se connectent en même temps ;
+- score_entry : rafales de saisies (lots par candidat et notes unitaires) ;
+- leaderboard : consultation répétée des classements et des données de référence ;
+- listing : pages des listes (candidats, utilisateurs), pour mesurer la sérialisation.
+
+Chaque requête est chronométrée et le nombre d'instructions SQL qu'elle émet est
+compté via l'événement before_cursor_execute de l'engine.
+"""
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import httpx
+from sqlalchemy import event
+from .. import models
+from .generator import BENCH_PASSWORD
+
+_queries: ContextVar = ContextVar("bench_queries", default=None)
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    seconds: float
+    queries: int
+
+
+@dataclass
+class Fixture:
+    """Identifiants nécessaires pour construire un trafic plausible"""
+    jury_emails: list = field(default_factory=list)
+    categories: dict = field(default_factory=dict)  # categorie_id -> (critères, candidats, jurys)
+
+
+def load_fixture(db) -> Fixture:
+    fixture = Fixture()
+    fixture.jury_emails = [e for (e,) in db.query(models.User.email).filter(models.User.role == "jury")]
+    crits, cands, jurys = {}, {}, {}
+    for cid, crit_id, vmax in db.query(models.Critere.categorie_id, models.Critere.id, models.Critere.valeur_max):
+        crits.setdefault(cid, []).append((crit_id, vmax))
+    for cand_id, cid in db.query(models.CandidateCategory.candidat_id, models.CandidateCategory.categorie_id):
+        cands.setdefault(cid, []).append(cand_id)
+    for jury_id, cid in db.query(models.CategoryJury.jury_id, models.CategoryJury.categorie_id):
+        jurys.setdefault(cid, []).append(jury_id)
+    for cid in crits:
+        if cands.get(cid) and jurys.get(cid):
+            fixture.categories[cid] = (crits[cid], cands[cid], jurys[cid])
+    return fixture
+
+
+def install_query_counter(engine):
+    def count(conn, cursor, statement, parameters, context, executemany):
+        holder = _queries.get()
+        if holder is not None:
+            holder[0] += 1
+    event.listen(engine, "before_cursor_execute", count)
+
+
+class Driver:
+    def __init__(self, app, fixture: Fixture, concurrency: int = 20, seed: int = 7):
+        self.app = app
+        self.fixture = fixture
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rng = random.Random(seed)
+        self.samples: list[Sample] = []
+
+    async def _call(self, client, endpoint: str, method: str, url: str, **kwargs):
+        async with self.semaphore:
+            holder = [0]
+            _queries.set(holder)  # propre à la tâche courante (et aux threads qu'elle utilise)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = response.status_code
+            except Exception:
+                status = 599
+            self.samples.append(Sample(endpoint, status, time.perf_counter() - start, holder[0]))
+
+    async def _gather(self, client, calls):
+        await asyncio.gather(*(asyncio.create_task(self._call(client, *c[:3], **c[3])) for c in calls))
+
+    def login_storm(self, nb: int):
+        emails = self.fixture.jury_emails
+        return [("POST /auth/login", "POST", "/auth/login",
+                 {"data": {"username": emails[i % len(emails)], "password": BENCH_PASSWORD}})
+                for i in range(nb)]
+
+    def score_entry(self, nb: int):
+        calls = []
+        cats = list(self.fixture.categories.items())
+        for _ in range(nb):
+            cat_id, (crits, cands, jurys) = self.rng.choice(cats)
+            cand, jury = self.rng.choice(cands), self.rng.choice(jurys)
+            if self.rng.random() < 0.5:
+                scores = [{"critere_id": c, "note": round(self.rng.uniform(0, vmax), 1)} for c, vmax in crits]
+                calls.append(("POST /scores/criteria-scores/batch", "POST", "/scores/criteria-scores/batch",
+                              {"json": {"candidat_id": cand, "jury_id": jury, "categorie_id": cat_id,
+                                        "scores": scores}}))
+            else:
+                crit, vmax = self.rng.choice(crits)
+                calls.append(("POST /scores/criteria-score", "POST", "/scores/criteria-score",
+                              {"json": {"candidat_id": cand, "jury_id": jury, "categorie_id": cat_id,
+                                        "critere_id": crit, "note": round(self.rng.uniform(0, vmax), 1)}}))
+        return calls
+
+    def leaderboard(self, nb: int):
+        reads = [
+            ("GET /scores/final_scores/{categorie_id}", "/scores/final_scores/{}"),
+            ("GET /scores/ranking/{categorie_id}", "/scores/ranking/{}"),
+            ("GET /categories/{categorie_id}/candidats", "/categories/{}/candidats"),
+            ("GET /criteres/by_category/{categorie_id}", "/criteres/by_category/{}"),
+            ("GET /categories/", None),
+        ]
+        cat_ids = list(self.fixture.categories)
+        calls = []
+        for _ in range(nb):
+            endpoint, template = self.rng.choice(reads)
+            url = template.format(self.rng.choice(cat_ids)) if template else "/categories/"
+            calls.append((endpoint, "GET", url, {}))
+        return calls
+
+    def listing(self, nb: int):
+        reads = [
+            ("GET /candidats/", "/candidats/", {"limit": 1000}),
+            ("GET /users/", "/users/", {"limit": 1000}),
+        ]
+        return [(endpoint, "GET", url, {"params": params})
+                for endpoint, url, params in (self.rng.choice(reads) for _ in range(nb))]
+
+    async def run(self, phases: list, log=print) -> float:
+        """Exécute les phases [(nom, appels)] l'une après l'autre ; retourne la durée totale (s)"""
+        transport = httpx.ASGITransport(app=self.app)  # ne déclenche pas le lifespan de l'application
+        async with self.app.router.lifespan_context(self.app):
+            started = time.perf_counter()
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name, calls in phases:
+                    phase_start = time.perf_counter()
+                    await self._gather(client, calls)
+                    log(f"  {name}: {len(calls)} requêtes en {time.perf_counter() - phase_start:.2f}s")
+            return time.perf_counter() - started
@@ -0,0 +1,98 @@
+# backend/bench/explain.py
+"""
+Vérifie par EXPLAIN que les filtres chauds sont servis par leur index.
+
+Chaque requête reprend le filtre d'un chemin de l'application, avec des
+identifiants réels tirés de la base, et nomme l'index de models.MANAGED_INDEXES
+qui doit la servir. Sur un petit jeu de données, Postgres préfère légitimement
+un Seq Scan : strict=True (tests) désactive les parcours séquentiels le temps
+de l'EXPLAIN pour vérifier que l'index existe et reste utilisable.
+"""
+import json
+from sqlalchemy import select, func, text
+from .. import models
+
+
+def hot_queries(db) -> list[tuple[str, str, str, object]]:
+    """(nom, table qui ne doit pas être parcourue, index attendu, requête)"""
+    cs, js, fs = models.CriteriaScore, models.JuryScore, models.FinalScore
+    sample = db.execute(select(cs.candidat_id, cs.jury_id, cs.categorie_id).limit(1)).first()
+    if sample is None:
+        return []
+    candidat_id, jury_id, categorie_id = sample
+    return [
+        ("refresh_final_score", "jury_scores", "ix_jury_scores_candidat_categorie",
+         select(func.sum(js.note_totale), func.count(js.id))
+         .where(js.candidat_id == candidat_id, js.categorie_id == categorie_id)),
+        ("final_score_rows", "final_scores", "ix_final_scores_categorie",
+         select(fs.candidat_id, fs.note_finale).where(fs.categorie_id == categorie_id)),
+        ("criteria_scores par catégorie", "criteria_scores", "ix_criteria_scores_categorie_candidat",
+         select(cs.candidat_id, cs.jury_id, cs.critere_id, cs.note).where(cs.categorie_id == categorie_id)),
+        ("criteria_scores par catégorie et candidat", "criteria_scores", "ix_criteria_scores_categorie_candidat",
+         select(cs.jury_id, cs.critere_id, cs.note)
+         .where(cs.categorie_id == categorie_id, cs.candidat_id == candidat_id)),
+        ("criteria_scores par jury et catégorie", "criteria_scores", "ix_criteria_scores_jury_categorie",
+         select(cs.candidat_id, cs.critere_id, cs.note)
+         .where(cs.jury_id == jury_id, cs.categorie_id == categorie_id)),
+        ("candidats d'une catégorie", "candidate_category", "ix_candidate_category_categorie",
+         select(models.CandidateCategory.candidat_id)
+         .where(models.CandidateCategory.categorie_id == categorie_id)),
+        ("jurys d'une catégorie", "category_jury", "ix_category_jury_categorie",
+         select(models.CategoryJury.jury_id).where(models.CategoryJury.categorie_id == categorie_id)),
+        ("critères d'une catégorie", "criteres", "ix_criteres_categorie",
+         select(models.Critere.id).where(models.Critere.categorie_id == categorie_id)),
+    ]
+
+
+def _pg_nodes(node) -> list[dict]:
+    found = [node]
+    for child in node.get("Plans", []):
+        found += _pg_nodes(child)
+    return found
+
+
+def plan(db, stmt) -> tuple[str, list[str], list[str]]:
+    """(plan lisible, tables parcourues séquentiellement, index utilisés)"""
+    dialect = db.get_bind().dialect
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "postgresql":
+        raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        nodes = _pg_nodes((json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"])
+        readable = "\n".join(r for (r,) in db.execute(text(f"EXPLAIN {sql}")))
+        seq = [n["Relation Name"] for n in nodes if n.get("Node Type") == "Seq Scan" and n.get("Relation Name")]
+        return readable, seq, [n["Index Name"] for n in nodes if n.get("Index Name")]
+    # SQLite : « SCAN t » = parcours complet, « SEARCH t USING [COVERING] INDEX ix (...) » = accès indexé
+    details = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    seq = [d.split()[1] for d in details if d.startswith("SCAN ") and "USING" not in d]
+    indexes = [d.split(" INDEX ", 1)[1].split()[0] for d in details if " INDEX " in d]
+    return "\n".join(details), seq, indexes
+
+
+def results(db, strict: bool = False) -> list[dict]:
+    """Plan de chaque requête chaude ; ok : pas de parcours de sa table et index attendu utilisé"""
+    queries = hot_queries(db)
+    if strict and db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+    try:
+        found = []
+        for name, table, index, stmt in queries:
+            readable, seq, indexes = plan(db, stmt)
+            found.append({"name": name, "table": table, "index": index, "plan": readable,
+                          "ok": table not in seq and index in indexes})
+        return found
+    finally:
+        if strict:
+            db.rollback()
+
+
+def check(db, log=print) -> bool:
+    """Affiche le plan de chaque requête chaude ; False si l'une n'utilise pas son index"""
+    found = results(db)
+    if not found:
+        log("Aucune note en base : lancer d'abord `python -m Back.bench generate`")
+        return False
+    for r in found:
+        log(f"[{'ok' if r['ok'] else 'ÉCHEC'}] {r['name']} ({r['index']})")
+        for line in r["plan"].splitlines():
+            log(f"    {line}")
+    return all(r["ok"] for r in found)
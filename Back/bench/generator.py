@@ -0,0 +1,122 @@
+# backend/bench/generator.py
+"""
+Générateur de données synthétiques déterministe (même graine => mêmes données).
+
+Chaque catégorie reçoit ses critères, une part des candidats et des jurys ;
+chaque jury assigné note une fraction `coverage` des candidats de la catégorie
+sur tous les critères. Les agrégats JuryScore / FinalScore sont ensuite
+reconstruits par catégorie.
+"""
+import random
+import time
+from sqlalchemy import insert, text
+from .. import models
+from ..utils import aggregation, security
+
+BENCH_PASSWORD = "bench-password"
+
+SCALES = {
+    "tiny": dict(categories=3, candidats=60, jurys=9, criteres=4, cand_per_cat=30, jurys_per_cat=4, coverage=1.0),
+    "small": dict(categories=10, candidats=1000, jurys=50, criteres=5, cand_per_cat=150, jurys_per_cat=8, coverage=1.0),
+    "medium": dict(categories=25, candidats=5000, jurys=200, criteres=5, cand_per_cat=300, jurys_per_cat=12, coverage=1.0),
+    # ≈ 50 × 1000 × 8 × 5 = 2M notes
+    "large": dict(categories=50, candidats=20000, jurys=500, criteres=5, cand_per_cat=1000, jurys_per_cat=8, coverage=1.0),
+}
+
+BATCH = 10000
+
+
+def _insert(db, model, rows):
+    for i in range(0, len(rows), BATCH):
+        db.execute(insert(model), rows[i:i + BATCH])
+
+
+def _sync_sequences(db, tables):
+    """Postgres : les id sont insérés explicitement, les séquences SERIAL repartent après le plus grand"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+            f"FROM {table}"
+        ))
+
+
+def generate(db, scale: dict, seed: int = 42, log=print) -> dict:
+    """Remplit une base vide ; retourne le nombre de lignes créées par table"""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    counts = {}
+
+    # un seul hachage Argon2 partagé : tous les jurys ont le mot de passe BENCH_PASSWORD
+    hashed = security.hash_password(BENCH_PASSWORD)
+    users = [{"id": 1, "nom": "Admin Bench", "email": "admin@bench.example.com", "mot_de_passe": hashed, "role": "admin"}]
+    users += [
+        {"id": j, "nom": f"Jury {j}", "email": f"jury{j}@bench.example.com", "mot_de_passe": hashed, "role": "jury"}
+        for j in range(2, scale["jurys"] + 2)
+    ]
+    _insert(db, models.User, users)
+    counts["users"] = len(users)
+
+    candidats = [
+        {"id": c, "nom": f"Nom{c}", "prenom": f"Prenom{c}", "email": f"candidat{c}@bench.example.com",
+         "projet": f"Projet {rng.randrange(10**6)}", "entreprise": f"Entreprise {rng.randrange(500)}"}
+        for c in range(1, scale["candidats"] + 1)
+    ]
+    _insert(db, models.Candidat, candidats)
+    counts["candidats"] = len(candidats)
+
+    categories = [{"id": k, "nom": f"Catégorie {k}", "description": f"Catégorie de test {k}"}
+                  for k in range(1, scale["categories"] + 1)]
+    _insert(db, models.Category, categories)
+    counts["categories"] = len(categories)
+
+    candidat_ids = [c["id"] for c in candidats]
+    jury_ids = [u["id"] for u in users[1:]]
+    criteres, cand_links, jury_links = [], [], []
+    plan = {}
+    critere_id = 0
+    for cat in categories:
+        crits = []
+        for _ in range(scale["criteres"]):
+            critere_id += 1
+            valeur_max = rng.choice([5, 10, 20])
+            criteres.append({"id": critere_id, "categorie_id": cat["id"], "nom": f"Critère {critere_id}",
+                             "valeur_max": valeur_max})
+            crits.append((critere_id, valeur_max))
+        cands = rng.sample(candidat_ids, min(scale["cand_per_cat"], len(candidat_ids)))
+        jurys = rng.sample(jury_ids, min(scale["jurys_per_cat"], len(jury_ids)))
+        cand_links += [{"candidat_id": c, "categorie_id": cat["id"]} for c in cands]
+        jury_links += [{"jury_id": j, "categorie_id": cat["id"]} for j in jurys]
+        plan[cat["id"]] = (crits, cands, jurys)
+
+    _insert(db, models.Critere, criteres)
+    _insert(db, models.CandidateCategory, cand_links)
+    _insert(db, models.CategoryJury, jury_links)
+    counts.update(criteres=len(criteres), candidate_category=len(cand_links), category_jury=len(jury_links))
+    _sync_sequences(db, ["users", "candidats", "categories", "criteres"])
+    db.commit()
+
+    # notes : écrites catégorie par catégorie pour garder la mémoire bornée
+    nb_scores = 0
+    for cat_id, (crits, cands, jurys) in plan.items():
+        rows = []
+        for j in jurys:
+            severity = rng.uniform(-0.15, 0.15)  # jurys plus ou moins sévères
+            for c in cands:
+                if rng.random() > scale["coverage"]:
+                    continue
+                quality = (c * 7919 % 1000) / 1000  # « vrai » niveau du candidat, stable entre jurys
+                for crit_id, valeur_max in crits:
+                    ratio = min(1.0, max(0.0, quality + severity + rng.gauss(0, 0.1)))
+                    rows.append({"candidat_id": c, "jury_id": j, "categorie_id": cat_id,
+                                 "critere_id": crit_id, "note": round(ratio * valeur_max, 1)})
+        _insert(db, models.CriteriaScore, rows)
+        nb_scores += len(rows)
+        aggregation.rebuild_category(db, cat_id)
+        db.commit()
+        log(f"  catégorie {cat_id}: {len(rows)} notes")
+    counts["criteria_scores"] = nb_scores
+
+    log(f"Génération terminée en {time.perf_counter() - started:.1f}s : {counts}")
+    return counts
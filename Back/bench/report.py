@@ -0,0 +1,79 @@
+# backend/bench/report.py
+"""Agrégation des mesures par endpoint et comparaison de deux rapports"""
+import json
+import statistics
+from collections import defaultdict
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples, wall_seconds: float, meta: dict) -> dict:
+    by_endpoint = defaultdict(list)
+    for s in samples:
+        by_endpoint[s.endpoint].append(s)
+
+    endpoints = {}
+    for endpoint, items in sorted(by_endpoint.items()):
+        latencies = sorted(s.seconds * 1000 for s in items)
+        endpoints[endpoint] = {
+            "count": len(items),
+            "errors": sum(1 for s in items if s.status >= 400),
+            "p50_ms": round(_percentile(latencies, 0.50), 3),
+            "p95_ms": round(_percentile(latencies, 0.95), 3),
+            "p99_ms": round(_percentile(latencies, 0.99), 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "queries_per_request": round(statistics.fmean(s.queries for s in items), 2),
+        }
+
+    return {
+        "meta": meta,
+        "wall_seconds": round(wall_seconds, 3),
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def format_table(report: dict) -> str:
+    lines = [f"{'endpoint':<45} {'n':>6} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'sql/req':>7}"]
+    for endpoint, e in report["endpoints"].items():
+        lines.append(f"{endpoint:<45} {e['count']:>6} {e['errors']:>4} {e['p50_ms']:>9.2f} "
+                     f"{e['p95_ms']:>9.2f} {e['p99_ms']:>9.2f} {e['queries_per_request']:>7.1f}")
+    lines.append(f"total: {report['requests']} requêtes, {report['throughput_rps']} req/s "
+                 f"en {report['wall_seconds']}s")
+    return "\n".join(lines)
+
+
+def compare(before: dict, after: dict) -> str:
+    """Différences (après / avant) de p50, p95, p99 et requêtes SQL par endpoint"""
+    def ratio(a, b):
+        return f"{b / a:>6.2f}x" if a else "     -"
+
+    lines = [f"{'endpoint':<45} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>14}"]
+    for endpoint in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        a, b = before["endpoints"].get(endpoint), after["endpoints"].get(endpoint)
+        if not a or not b:
+            lines.append(f"{endpoint:<45} {'(absent d un des rapports)':>30}")
+            continue
+        lines.append(f"{endpoint:<45} {ratio(a['p50_ms'], b['p50_ms']):>8} {ratio(a['p95_ms'], b['p95_ms']):>8} "
+                     f"{ratio(a['p99_ms'], b['p99_ms']):>8} "
+                     f"{a['queries_per_request']:>6.1f} -> {b['queries_per_request']:<5.1f}")
+    lines.append(f"débit : {before['throughput_rps']} -> {after['throughput_rps']} req/s "
+                 f"({ratio(before['throughput_rps'], after['throughput_rps']).strip()})")
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(report: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
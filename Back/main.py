@@ -1,19 +1,70 @@
 # backend/main.py
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .database import engine
+from fastapi.responses import PlainTextResponse
+from .database import engine, async_engine, SessionLocal, DB_MODE, replica_engines, async_replica_engines
 from . import models
-from .routers import auth, users, candidats, categories, criteres, scores
+from .routers import auth, users, candidats, categories, criteres, scores, internal
+from .utils import (pagination, hashing, profiling, write_buffer, validation_index, singleflight, invalidation,
+                    read_routing, etag)
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI(title="API Evaluation - FastAPI")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invalidation.listener.start()  # Postgres uniquement : écoute des écritures des autres workers
+    db = SessionLocal()
+    try:
+        validation_index.index.load(db)  # sinon chargé à la première écriture de note
+    except Exception:
+        logging.getLogger("evaluation").exception("Index de validation non chargé au démarrage")
+    finally:
+        db.close()
+    if profiling.sampler is not None:
+        profiling.sampler.start()
+    if write_buffer.buffer is not None:
+        write_buffer.buffer.start()
+    yield
+    if write_buffer.buffer is not None:
+        write_buffer.buffer.shutdown()  # écrit les notes encore en attente
+    if profiling.sampler is not None:
+        profiling.sampler.stop()
+    invalidation.listener.stop()
+    hashing.shutdown()
+
+
+app = FastAPI(title="API Evaluation - FastAPI", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=pagination.PAGE_HEADERS,
 )
+# Latence, nombre de requêtes SQL et temps en base par route (exportés sur /metrics)
+app.add_middleware(profiling.ProfilingMiddleware)
+profiling.instrument(engine)
+if async_engine is not None:
+    profiling.instrument(async_engine.sync_engine)
+for _, replica_engine, _ in replica_engines:
+    profiling.instrument(replica_engine)
+for _, replica_engine, _ in async_replica_engines:
+    profiling.instrument(replica_engine.sync_engine)
+# Lectures sur le primaire pendant READ_AFTER_WRITE_WINDOW après une écriture du client (cookie)
+app.add_middleware(read_routing.ReadAfterWriteMiddleware)
+# ETag des lectures de tableaux de bord (304 décidés par etag.conditional avant toute requête)
+app.add_middleware(etag.ETagMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métriques de ce worker au format texte Prometheus"""
+    text = profiling.registry.render()
+    if singleflight.flights is not None:
+        text += singleflight.flights.render()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
 
 
 # Si tu veux créer les tables via SQLAlchemy (optionnel)
@@ -21,9 +72,19 @@ app.add_middleware(
 
 
 
+# DB_MODE=async : les versions async def des routeurs chauds sont montées en premier
+# et prennent donc la main sur les mêmes chemins ; le reste reste servi en sync.
+if DB_MODE == "async":
+    from .routers import async_scores, async_categories, async_candidats
+
+    app.include_router(async_scores.router)
+    app.include_router(async_categories.router)
+    app.include_router(async_candidats.router)
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(candidats.router)
 app.include_router(categories.router)
 app.include_router(criteres.router)
 app.include_router(scores.router)
+app.include_router(internal.router)
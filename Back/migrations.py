@@ -0,0 +1,91 @@
+# backend/migrations.py
+"""
+Mise à niveau des index d'une base existante.
+
+create_all ne crée que les tables absentes : les index déclarés plus tard dans
+les __table_args__ de models.py (liste models.MANAGED_INDEXES) doivent être
+ajoutés aux tables déjà en place. Ce module compare ces index à ceux présents
+en base et crée ceux qui manquent (CREATE INDEX CONCURRENTLY sur Postgres : pas
+de verrou d'écriture pendant la construction), puis rafraîchit les statistiques
+du planificateur.
+
+    python -m Back.migrations            # crée les index manquants
+    python -m Back.migrations --dry-run  # affiche seulement le DDL
+"""
+import argparse
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+from .database import engine, Base
+from . import models
+
+
+def _invalid_indexes(bind) -> set[str]:
+    """Postgres : index laissés INVALID par un CREATE INDEX CONCURRENTLY interrompu"""
+    if bind.dialect.name != "postgresql":
+        return set()
+    with bind.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+        ))
+        return {name for (name,) in rows}
+
+
+def _applies_to(index, dialect) -> bool:
+    if index.name not in models.MANAGED_INDEXES:
+        return False  # index de colonne : couvert par les contraintes du schéma d'origine
+    dialects = models.MANAGED_INDEXES[index.name]
+    return dialects is None or dialect.name in dialects
+
+
+def missing_indexes(bind) -> list:
+    """Index gérés (models.MANAGED_INDEXES) absents (ou invalides) sur les tables existantes"""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    invalid = _invalid_indexes(bind)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # create_all créera la table avec ses index
+        present = {ix["name"] for ix in inspector.get_indexes(table.name)} - invalid
+        missing += [ix for ix in sorted(table.indexes, key=lambda i: i.name)
+                    if ix.name not in present and _applies_to(ix, bind.dialect)]
+    return missing
+
+
+def index_ddl(index, dialect) -> list[str]:
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    if dialect.name != "postgresql":
+        return [ddl]
+    return [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}",  # reste éventuel d'une tentative avortée
+        ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1),
+    ]
+
+
+def upgrade(bind=engine, dry_run: bool = False, log=print) -> list[str]:
+    """Crée les index manquants ; retourne les instructions DDL (exécutées ou non)"""
+    missing = missing_indexes(bind)
+    statements = [ddl for ix in missing for ddl in index_ddl(ix, bind.dialect)]
+    if any(ix.name == "ix_candidats_recherche_trgm" for ix in missing):
+        statements.insert(0, "CREATE EXTENSION IF NOT EXISTS pg_trgm")  # opclasses gin_trgm_ops
+    if dry_run or not statements:
+        for ddl in statements:
+            log(ddl)
+        return statements
+
+    # CONCURRENTLY est interdit dans une transaction : une instruction par commit
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for ddl in statements:
+            log(ddl)
+            conn.execute(text(ddl))
+        conn.execute(text("ANALYZE"))
+    return statements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m Back.migrations")
+    parser.add_argument("--dry-run", action="store_true", help="Affiche le DDL sans l'exécuter")
+    args = parser.parse_args()
+    done = upgrade(dry_run=args.dry_run)
+    if not done:
+        print("Aucun index manquant")
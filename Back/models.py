@@ -1,5 +1,5 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Numeric, UniqueConstraint, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -23,6 +23,22 @@ class Candidat(Base):
     entreprise = Column(Text)
     date_creation = Column(TIMESTAMP, server_default=func.now())
 
+    # recherche (GET /candidats/search) : index trigramme Postgres, ILIKE et similarité sur chaque colonne ;
+    # ignoré ailleurs (SQLite utilise l'index en mémoire de utils/candidate_search.py)
+    __table_args__ = (
+        Index(
+            'ix_candidats_recherche_trgm', 'nom', 'prenom', 'email', 'projet', 'entreprise',
+            postgresql_using='gin',
+            postgresql_ops={c: 'gin_trgm_ops' for c in ('nom', 'prenom', 'email', 'projet', 'entreprise')},
+        ).ddl_if(dialect='postgresql'),
+    )
+
+# gin_trgm_ops vient de l'extension pg_trgm
+event.listen(
+    Base.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 class Category(Base):
     __tablename__ = "categories"
     id = Column(Integer, primary_key=True, index=True)
@@ -34,11 +50,20 @@ class CategoryJury(Base):
     jury_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     categorie_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
 
+    # la PK (jury_id, categorie_id) ne sert pas les recherches par catégorie seule
+    __table_args__ = (
+        Index('ix_category_jury_categorie', 'categorie_id'),
+    )
+
 class CandidateCategory(Base):
     __tablename__ = "candidate_category"
     candidat_id = Column(Integer, ForeignKey("candidats.id", ondelete="CASCADE"), primary_key=True)
     categorie_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        Index('ix_candidate_category_categorie', 'categorie_id'),
+    )
+
 class Critere(Base):
     __tablename__ = "criteres"
     id = Column(Integer, primary_key=True, index=True)
@@ -46,6 +71,10 @@ class Critere(Base):
     nom = Column(String(200), nullable=False)
     valeur_max = Column(Integer, nullable=False)
 
+    __table_args__ = (
+        Index('ix_criteres_categorie', 'categorie_id'),
+    )
+
 class CriteriaScore(Base):
     __tablename__ = "criteria_scores"
     id = Column(Integer, primary_key=True, index=True)
@@ -59,6 +88,10 @@ class CriteriaScore(Base):
 
     __table_args__ = (
         UniqueConstraint('candidat_id', 'jury_id', 'critere_id', name='uq_candidat_jury_critere'),
+        # classement / export / reconstruction d'une catégorie, notes d'un candidat dans une catégorie
+        Index('ix_criteria_scores_categorie_candidat', 'categorie_id', 'candidat_id'),
+        # notes d'un jury dans une catégorie (progression, saisie)
+        Index('ix_criteria_scores_jury_categorie', 'jury_id', 'categorie_id'),
     )
 
 class JuryScore(Base):
@@ -72,6 +105,8 @@ class JuryScore(Base):
 
     __table_args__ = (
         UniqueConstraint('candidat_id', 'jury_id', 'categorie_id', name='uq_candidat_jury_categorie'),
+        # recalcul du score final d'un candidat (aggregation.refresh_final_score)
+        Index('ix_jury_scores_candidat_categorie', 'candidat_id', 'categorie_id'),
     )
 
 class FinalScore(Base):
@@ -85,4 +120,21 @@ class FinalScore(Base):
 
     __table_args__ = (
         UniqueConstraint('candidat_id', 'categorie_id', name='uq_candidat_categorie_final'),
+        # classement d'une catégorie
+        Index('ix_final_scores_categorie', 'categorie_id'),
     )
+
+# Index ajoutés aux bases existantes par migrations.py : ceux des __table_args__
+# ci-dessus, avec les dialectes concernés (None : tous). Les index de colonne
+# (index=True, unique=True) ne sont pas repris : un schéma créé par
+# iceberg_evaluation.sql les couvre déjà par ses contraintes PRIMARY KEY / UNIQUE.
+MANAGED_INDEXES = {
+    'ix_candidats_recherche_trgm': ('postgresql',),
+    'ix_category_jury_categorie': None,
+    'ix_candidate_category_categorie': None,
+    'ix_criteres_categorie': None,
+    'ix_criteria_scores_categorie_candidat': None,
+    'ix_criteria_scores_jury_categorie': None,
+    'ix_jury_scores_candidat_categorie': None,
+    'ix_final_scores_categorie': None,
+}
@@ -0,0 +1,40 @@
+# backend/routers/async_candidats.py
+"""Lectures de candidats en async def (montées à la place des versions sync si DB_MODE=async)"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import schemas, models
+from ..database import get_async_read_db
+from ..utils import pagination, candidate_search, etag
+
+router = APIRouter(prefix="/candidats", tags=["candidats"])
+
+@router.get("/", response_model=list[schemas.CandidatOut], dependencies=[etag.conditional("candidats")])
+async def list_candidats(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    after: Optional[int] = Query(None, description="Curseur : id du dernier élément reçu"),
+    fields: Optional[str] = Query(None, description="Colonnes à renvoyer, ex. nom,email"),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await db.run_sync(
+        pagination.list_page, models.Candidat, schemas.CandidatOut, response, limit, after, fields, count
+    )
+
+@router.get("/search", response_model=list[schemas.CandidatOut])
+async def search_candidats(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=pagination.MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await db.run_sync(candidate_search.search, q, limit, offset, response)
+
+@router.get("/{candidat_id}", response_model=schemas.CandidatOut)
+async def get_candidat(candidat_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    candidat = await db.get(models.Candidat, candidat_id)
+    if not candidat:
+        raise HTTPException(status_code=404, detail="Candidat introuvable")
+    return candidat
@@ -0,0 +1,80 @@
+# backend/routers/async_categories.py
+"""Lectures de catégories en async def (montées à la place des versions sync si DB_MODE=async)"""
+from collections import defaultdict
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import schemas, models
+from ..database import get_async_db, get_async_read_db
+from ..utils import pagination, reference_cache, serialization, etag
+
+router = APIRouter(prefix="/categories", tags=["categories"])
+
+@router.get("/", response_model=list[schemas.CategoryOut], dependencies=[etag.conditional("categories")])
+async def list_categories(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    after: Optional[int] = Query(None, description="Curseur : id du dernier élément reçu"),
+    fields: Optional[str] = Query(None, description="Colonnes à renvoyer, ex. nom,email"),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    db: AsyncSession = Depends(get_async_db),  # liste complète servie par le cache : chargée depuis le primaire
+):
+    if limit is None and after is None and fields is None and count is None:
+        cached = reference_cache.CATEGORIES.get(reference_cache.ALL)
+        if cached is None:
+            generation = reference_cache.CATEGORIES.generation
+            columns = serialization.schema_columns(models.Category, schemas.CategoryOut)
+            cached = serialization.as_dicts(await db.execute(select(*columns)), columns)
+            reference_cache.CATEGORIES.set(reference_cache.ALL, cached, generation=generation)
+        return serialization.respond(cached)
+    return await db.run_sync(
+        pagination.list_page, models.Category, schemas.CategoryOut, response, limit, after, fields, count
+    )
+
+@router.get("/assignments")
+async def get_all_assignments(db: AsyncSession = Depends(get_async_read_db)):
+    """Retourne, pour chaque catégorie assignée, ses candidats et ses jurys (deux requêtes au total)"""
+    assignations = defaultdict(lambda: {"candidats": [], "jurys": []})
+
+    candidats = await db.execute(
+        select(models.CandidateCategory.categorie_id, models.Candidat.id, models.Candidat.nom,
+               models.Candidat.prenom, models.Candidat.email)
+        .join(models.Candidat, models.Candidat.id == models.CandidateCategory.candidat_id)
+    )
+    for categorie_id, c_id, nom, prenom, email in candidats:
+        assignations[categorie_id]["candidats"].append(
+            {"id": c_id, "nom": nom, "prenom": prenom, "email": email}
+        )
+
+    jurys = await db.execute(
+        select(models.CategoryJury.categorie_id, models.User.id, models.User.nom,
+               models.User.email, models.User.role)
+        .join(models.User, models.User.id == models.CategoryJury.jury_id)
+    )
+    for categorie_id, j_id, nom, email, role in jurys:
+        assignations[categorie_id]["jurys"].append(
+            {"id": j_id, "nom": nom, "email": email, "role": role}
+        )
+
+    return serialization.respond(assignations)
+
+@router.get("/{categorie_id}/candidats")
+async def get_candidats_in_categorie(categorie_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Retourne la liste des candidats assignés à une catégorie"""
+    rows = await db.execute(
+        select(models.Candidat.id, models.Candidat.nom, models.Candidat.prenom, models.Candidat.email)
+        .join(models.CandidateCategory, models.CandidateCategory.candidat_id == models.Candidat.id)
+        .where(models.CandidateCategory.categorie_id == categorie_id)
+    )
+    return serialization.respond([{"id": c.id, "nom": c.nom, "prenom": c.prenom, "email": c.email} for c in rows])
+
+@router.get("/{categorie_id}/jurys")
+async def get_jurys_in_categorie(categorie_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Retourne la liste des jurys assignés à une catégorie"""
+    rows = await db.execute(
+        select(models.User.id, models.User.nom, models.User.email, models.User.role)
+        .join(models.CategoryJury, models.CategoryJury.jury_id == models.User.id)
+        .where(models.CategoryJury.categorie_id == categorie_id)
+    )
+    return serialization.respond([{"id": j.id, "nom": j.nom, "email": j.email, "role": j.role} for j in rows])
@@ -0,0 +1,78 @@
+# backend/routers/async_scores.py
+"""Chemin chaud des notes en async def (monté à la place des versions sync si DB_MODE=async)"""
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import schemas, models
+from ..database import get_async_db, get_async_read_db
+from ..utils import scoring, leaderboard, write_buffer, validation_index, singleflight, read_routing, etag
+
+router = APIRouter(prefix="/scores", tags=["scores"])
+
+@router.post("/criteria-score")
+async def add_criteria_score(request: schemas.CriteriaScoreCreate, response: Response,
+                             db: AsyncSession = Depends(get_async_db)):
+    await validation_index.validate_async(db, request.categorie_id, request.candidat_id, request.jury_id,
+                                          [(request.critere_id, request.note)])
+    if write_buffer.buffer is not None:
+        write_buffer.buffer.put(request.candidat_id, request.jury_id, request.categorie_id,
+                                request.critere_id, request.note, request.commentaire)
+        read_routing.mark_write()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Score accepted", "score": request.dict()}
+
+    # upsert + agrégats partagés avec le chemin sync, exécutés sur la connexion asynchrone
+    rows = await db.run_sync(
+        scoring.upsert_criteria_scores,
+        request.candidat_id, request.jury_id, request.categorie_id,
+        [{"critere_id": request.critere_id, "note": request.note, "commentaire": request.commentaire}],
+    )
+    await db.commit()
+    await db.run_sync(leaderboard.publish_change, request.categorie_id, [request.candidat_id])
+
+    row = rows[0]
+    message = "Score updated" if row["status"] == "updated" else "Score created"
+    # ligne relue après le commit : même réponse que la route sync (date_creation comprise)
+    score = await db.get(models.CriteriaScore, row["id"], populate_existing=True)
+    return {"message": message, "score": score}
+
+@router.post("/criteria-scores/batch", response_model=schemas.CriteriaScoreBatchOut)
+async def add_criteria_scores_batch(request: schemas.CriteriaScoreBatchCreate,
+                                    db: AsyncSession = Depends(get_async_db)):
+    """Enregistre toutes les notes d'un jury pour un candidat dans une seule transaction"""
+    await validation_index.validate_async(db, request.categorie_id, request.candidat_id, request.jury_id,
+                                          [(s.critere_id, s.note) for s in request.scores])
+    if write_buffer.buffer is not None:
+        await run_in_threadpool(write_buffer.buffer.discard,
+                                [(request.candidat_id, request.jury_id, s.critere_id) for s in request.scores])
+    rows = await db.run_sync(
+        scoring.upsert_criteria_scores,
+        request.candidat_id, request.jury_id, request.categorie_id,
+        [s.dict() for s in request.scores],
+    )
+    await db.commit()
+    await db.run_sync(leaderboard.publish_change, request.categorie_id, [request.candidat_id])
+
+    created = sum(1 for r in rows if r["status"] == "created")
+    return {"created": created, "updated": len(rows) - created, "scores": rows}
+
+@router.get("/jury-scores/{candidat_id}/{categorie_id}")
+async def get_jury_scores(candidat_id: int, categorie_id: int, db: AsyncSession = Depends(get_async_db)):
+    if write_buffer.buffer is not None:
+        await run_in_threadpool(
+            write_buffer.buffer.flush,
+            lambda key, value: key[0] == candidat_id and value["categorie_id"] == categorie_id,
+        )
+    scores = await db.scalars(
+        select(models.JuryScore).where(
+            models.JuryScore.candidat_id == candidat_id,
+            models.JuryScore.categorie_id == categorie_id,
+        )
+    )
+    return scores.all()
+
+@router.get("/final_scores/{categorie_id}", dependencies=[etag.conditional("scores:{categorie_id}", "candidats")])
+async def get_final_scores_by_category(categorie_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await singleflight.respond_async(("final_scores", categorie_id, read_routing.source(db)),
+                                            lambda: db.run_sync(leaderboard.final_score_rows, categorie_id))
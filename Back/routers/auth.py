@@ -1,17 +1,104 @@
 # backend/routers/auth.py
+import hashlib
+import os
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from Back.utils import security
+from Back.utils import security, hashing, invalidation
+from Back.utils.cache import TTLCache
 from ..database import get_db
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+# Jetons décodés, indexés par leur empreinte SHA-256 ; une entrée ne survit pas à l'exp du jeton
+TOKEN_CACHE = TTLCache("tokens", maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+# Lignes users (id, nom, email, role) : TTL court, invalidées à chaque modification
+USER_CACHE = TTLCache("users", maxsize=int(os.getenv("USER_CACHE_SIZE", "5000")),
+                      ttl=float(os.getenv("USER_CACHE_TTL", "30")))
+
+CREDENTIALS_ERROR = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Jeton invalide ou expiré",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _decode_cached(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = TOKEN_CACHE.get(key)
+    if payload is None:
+        payload = security.decode_access_token(token)
+        if payload is None or "user_id" not in payload:
+            raise CREDENTIALS_ERROR
+        TOKEN_CACHE.set(key, payload, expires_at=payload.get("exp"))
+    return payload
+
+
+def _load_user(db: Session, user_id: int):
+    user = db.query(models.User.id, models.User.nom, models.User.email, models.User.role).filter(
+        models.User.id == user_id
+    ).first()
+    return schemas.UserOut.model_validate(user._asdict()) if user else None
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> schemas.UserOut:
+    """Utilisateur authentifié ; ni décodage JWT ni requête SQL tant que les caches sont chauds"""
+    payload = _decode_cached(token)
+    user_id = payload["user_id"]
+    user = USER_CACHE.get(user_id)
+    if user is None:
+        generation = USER_CACHE.generation
+        user = _load_user(db, user_id)
+        if user is None:
+            raise CREDENTIALS_ERROR
+        USER_CACHE.set(user_id, user, generation=generation)
+    return user
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    USER_CACHE.pop(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        invalidation.publish(session, "user", target.id)
+
+
+@event.listens_for(models.User, "after_insert")
+def _announce_user(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        invalidation.publish(session, "user", target.id)
+
+
+def _forget_users(events):
+    """Utilisateurs modifiés par un autre worker (bus d'invalidation)"""
+    for _, user_id, _ in events:
+        USER_CACHE.pop(user_id)
+
+
+invalidation.subscribe("user", _forget_users)
+
+def _find_user(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.mot_de_passe):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # accès base dans le threadpool, Argon2 dans le pool de processus : la boucle reste libre
+    user = await run_in_threadpool(_find_user, db, form_data.username)
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await hashing.verify_and_rehash(form_data.password, user.mot_de_passe)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Identifiants invalides")
+    if new_hash:
+        # paramètres Argon2 obsolètes : on remplace le hash de façon transparente
+        user.mot_de_passe = new_hash
+        await run_in_threadpool(db.commit)
     token = security.create_access_token({"user_id": user.id, "role": user.role , "nom": user.nom, "email": user.email})
     return {"access_token": token, "token_type": "bearer"}
@@ -1,8 +1,12 @@
 # backend/routers/candidats.py
-from fastapi import APIRouter, Depends, HTTPException , status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException , Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..utils import pagination, candidate_import, candidate_search, validation_index, invalidation, etag
 
 router = APIRouter(prefix="/candidats", tags=["candidats"])
 
@@ -13,30 +17,79 @@ def create_candidat(payload: schemas.CandidatCreate, db: Session = Depends(get_d
         raise HTTPException(status_code=400, detail="Email candidat déjà existant")
     c = models.Candidat(**payload.dict())
     db.add(c)
+    db.flush()
+    invalidation.publish(db, "candidat", c.id)
     db.commit()
     db.refresh(c)
-    # 🩵 Conversion manuelle avant le retour
-    c.date_creation = c.date_creation.isoformat()
+    candidate_search.index.add([(c.id, payload.dict())])
     return c
 
-@router.get("/", response_model=list[schemas.CandidatOut])
-def list_candidats(db: Session = Depends(get_db)):
-    candidat= db.query(models.Candidat).all()
-    for c in candidat:
-        c.date_creation = c.date_creation.isoformat()
-    return candidat
-    
+@router.post("/import")
+async def import_candidats(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$",
+                                  description="csv ou ndjson (déduit du Content-Type si absent)"),
+    chunk_size: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Import en flux de candidats (et de leurs catégories par nom) avec rapport d'erreurs par ligne"""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    report = candidate_import.ImportReport()
+    categories_by_name = await run_in_threadpool(candidate_import.category_ids_by_name, db)
+    chunk = []
+
+    async for line_no, record in candidate_import.records(request.stream(), format):
+        report.lignes += 1
+        if isinstance(record, Exception):
+            report.error(line_no, str(record))
+            continue
+        try:
+            candidat, categories = candidate_import.parse_record(record)
+        except ValidationError as e:
+            report.error(line_no, candidate_import.validation_message(e), record.get("email"))
+            continue
+        chunk.append((line_no, candidat, categories))
+        if len(chunk) >= chunk_size:
+            await run_in_threadpool(candidate_import.load_chunk, db, chunk, categories_by_name, report)
+            chunk = []
+
+    if chunk:
+        await run_in_threadpool(candidate_import.load_chunk, db, chunk, categories_by_name, report)
+
+    return report.as_dict()
+
+@router.get("/", response_model=list[schemas.CandidatOut], dependencies=[etag.conditional("candidats")])
+def list_candidats(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    after: Optional[int] = Query(None, description="Curseur : id du dernier élément reçu"),
+    fields: Optional[str] = Query(None, description="Colonnes à renvoyer, ex. nom,email"),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    db: Session = Depends(get_read_db),
+):
+    return pagination.list_page(db, models.Candidat, schemas.CandidatOut, response, limit, after, fields, count)
+
+@router.get("/search", response_model=list[schemas.CandidatOut])
+def search_candidats(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=pagination.MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    """Recherche par préfixe et approximative (nom, prénom, email, projet, entreprise), résultats classés"""
+    return candidate_search.search(db, q, limit, offset, response)
 
 @router.get("/{candidat_id}", response_model=schemas.CandidatOut)
-def get_candidat(candidat_id: int, db: Session = Depends(get_db)):
+def get_candidat(candidat_id: int, db: Session = Depends(get_read_db)):
     candidat= db.query(models.Candidat).get(candidat_id)
      
     
     if not candidat:
         raise HTTPException(status_code=404, detail="Candidat introuvable")
-    # ✅ convertir date_creation en string ISO (si besoin)
-    if hasattr(candidat, "date_creation") and isinstance(candidat.date_creation, (str, bytes)) is False:
-        candidat.date_creation = candidat.date_creation.isoformat()
     return candidat
 
 # --- Suppression d'un candidat ---
@@ -51,5 +104,8 @@ def delete_candidat(candidat_id: int, db: Session = Depends(get_db)):
         )
 
     db.delete(candidat)
+    invalidation.publish(db, "candidat", candidat_id)
     db.commit()
+    validation_index.index.forget_candidat(candidat_id)
+    candidate_search.index.remove(candidat_id)
     return {"message": "Candidat supprimé avec succès"}
\ No newline at end of file
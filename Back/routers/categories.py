@@ -1,8 +1,11 @@
 # backend/routers/categories.py
-from fastapi import APIRouter, Depends, HTTPException ,status
+from collections import defaultdict
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException , Query, Response, status
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..utils import pagination, reference_cache, serialization, validation_index, invalidation, etag
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
@@ -13,13 +16,27 @@ def create_category(payload: schemas.CategoryCreate, db: Session = Depends(get_d
         raise HTTPException(status_code=400, detail="Catégorie existante")
     c = models.Category(**payload.dict())
     db.add(c)
+    invalidation.publish(db, "categorie")
     db.commit()
     db.refresh(c)
+    reference_cache.invalidate_categories()
     return c
 
-@router.get("/", response_model=list[schemas.CategoryOut])
-def list_categories(db: Session = Depends(get_db)):
-    return db.query(models.Category).all()
+@router.get("/", response_model=list[schemas.CategoryOut], dependencies=[etag.conditional("categories")])
+def list_categories(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    after: Optional[int] = Query(None, description="Curseur : id du dernier élément reçu"),
+    fields: Optional[str] = Query(None, description="Colonnes à renvoyer, ex. nom,email"),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    db: Session = Depends(get_db),  # liste complète servie par le cache : chargée depuis le primaire
+):
+    if limit is None and after is None and fields is None and count is None:
+        columns = serialization.schema_columns(models.Category, schemas.CategoryOut)
+        return serialization.respond(reference_cache.CATEGORIES.get_or_load(
+            reference_cache.ALL, lambda: serialization.as_dicts(db.query(*columns).all(), columns)
+        ))
+    return pagination.list_page(db, models.Category, schemas.CategoryOut, response, limit, after, fields, count)
 
 @router.post("/{categorie_id}/add_candidat/{candidat_id}")
 def add_candidat_to_categorie(
@@ -52,7 +69,9 @@ def add_candidat_to_categorie(
         categorie_id=categorie_id
     )
     db.add(link)
+    invalidation.publish(db, "assignation", candidat_id, categorie_id)
     db.commit()
+    validation_index.index.add_candidats([(categorie_id, candidat_id)])
 
     return {"message": "Candidat ajouté à la catégorie avec succès!"}
 
@@ -88,48 +107,64 @@ def add_jury_to_categorie(
         categorie_id=categorie_id
     )
     db.add(link)
+    invalidation.publish(db, "assignation", jury_id, categorie_id)
     db.commit()
+    validation_index.index.add_jury(categorie_id, jury_id)
 
     return {"message": "Jury ajouté à la catégorie avec succès ✅"}
 
+@router.get("/assignments")
+def get_all_assignments(db: Session = Depends(get_read_db)):
+    """Retourne, pour chaque catégorie assignée, ses candidats et ses jurys (deux requêtes au total)"""
+    assignations = defaultdict(lambda: {"candidats": [], "jurys": []})
+
+    candidats = (
+        db.query(models.CandidateCategory.categorie_id, models.Candidat.id, models.Candidat.nom,
+                 models.Candidat.prenom, models.Candidat.email)
+        .join(models.Candidat, models.Candidat.id == models.CandidateCategory.candidat_id)
+        .all()
+    )
+    for categorie_id, c_id, nom, prenom, email in candidats:
+        assignations[categorie_id]["candidats"].append(
+            {"id": c_id, "nom": nom, "prenom": prenom, "email": email}
+        )
+
+    jurys = (
+        db.query(models.CategoryJury.categorie_id, models.User.id, models.User.nom,
+                 models.User.email, models.User.role)
+        .join(models.User, models.User.id == models.CategoryJury.jury_id)
+        .all()
+    )
+    for categorie_id, j_id, nom, email, role in jurys:
+        assignations[categorie_id]["jurys"].append(
+            {"id": j_id, "nom": nom, "email": email, "role": role}
+        )
+
+    return serialization.respond(assignations)
+
+
 @router.get("/{categorie_id}/candidats")
-def get_candidats_in_categorie(categorie_id: int, db: Session = Depends(get_db)):
+def get_candidats_in_categorie(categorie_id: int, db: Session = Depends(get_read_db)):
     """Retourne la liste des candidats assignés à une catégorie"""
-    liens = db.query(models.CandidateCategory).filter(
-        models.CandidateCategory.categorie_id == categorie_id
-    ).all()
-
-    candidats = []
-    for l in liens:
-        c = db.query(models.Candidat).filter(models.Candidat.id == l.candidat_id).first()
-        if c:
-            candidats.append({
-                "id": c.id,
-                "nom": c.nom,
-                "prenom": c.prenom,
-                "email": c.email
-            })
-    return candidats
+    rows = (
+        db.query(models.Candidat.id, models.Candidat.nom, models.Candidat.prenom, models.Candidat.email)
+        .join(models.CandidateCategory, models.CandidateCategory.candidat_id == models.Candidat.id)
+        .filter(models.CandidateCategory.categorie_id == categorie_id)
+        .all()
+    )
+    return serialization.respond([{"id": c.id, "nom": c.nom, "prenom": c.prenom, "email": c.email} for c in rows])
 
 
 @router.get("/{categorie_id}/jurys")
-def get_jurys_in_categorie(categorie_id: int, db: Session = Depends(get_db)):
+def get_jurys_in_categorie(categorie_id: int, db: Session = Depends(get_read_db)):
     """Retourne la liste des jurys assignés à une catégorie"""
-    liens = db.query(models.CategoryJury).filter(
-        models.CategoryJury.categorie_id == categorie_id
-    ).all()
-
-    jurys = []
-    for l in liens:
-        j = db.query(models.User).filter(models.User.id == l.jury_id).first()
-        if j:
-            jurys.append({
-                "id": j.id,
-                "nom": j.nom,
-                "email": j.email,
-                "role": j.role
-            })
-    return jurys
+    rows = (
+        db.query(models.User.id, models.User.nom, models.User.email, models.User.role)
+        .join(models.CategoryJury, models.CategoryJury.jury_id == models.User.id)
+        .filter(models.CategoryJury.categorie_id == categorie_id)
+        .all()
+    )
+    return serialization.respond([{"id": j.id, "nom": j.nom, "email": j.email, "role": j.role} for j in rows])
 
 
 @router.delete("/{categorie_id}/remove_candidat/{candidat_id}", status_code=status.HTTP_200_OK)
@@ -145,7 +180,9 @@ def remove_candidat_from_categorie(
         raise HTTPException(status_code=404, detail="Candidat non trouvé dans cette catégorie")
 
     db.delete(link)
+    invalidation.publish(db, "assignation", candidat_id, categorie_id)
     db.commit()
+    validation_index.index.remove_candidat(categorie_id, candidat_id)
     return {"message": "Candidat retiré avec succès ✅"}
 
 
@@ -162,7 +199,9 @@ def remove_jury_from_categorie(
         raise HTTPException(status_code=404, detail="Jury non trouvé dans cette catégorie")
 
     db.delete(link)
+    invalidation.publish(db, "assignation", jury_id, categorie_id)
     db.commit()
+    validation_index.index.remove_jury(categorie_id, jury_id)
     return {"message": "Jury retiré avec succès ✅"}
 
     # --- Suppression d'un categorie ---
@@ -177,5 +216,9 @@ def delete_categorie(categorie_id: int, db: Session = Depends(get_db)):
         )
 
     db.delete(categorie)
+    invalidation.publish(db, "categorie", categorie_id, categorie_id)
     db.commit()
+    reference_cache.invalidate_categories()
+    reference_cache.invalidate_criteres(categorie_id)
+    validation_index.index.forget_category(categorie_id)
     return {"message": "Candidat supprimé avec succès"}
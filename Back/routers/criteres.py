@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import schemas, models
 from ..database import get_db
+from ..utils import reference_cache, serialization, validation_index, invalidation
 
 router = APIRouter(prefix="/criteres", tags=["criteres"])
 
@@ -14,10 +15,16 @@ def create_critere(payload: schemas.CritereCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=404, detail="Catégorie introuvable")
     crit = models.Critere(**payload.dict())
     db.add(crit)
+    invalidation.publish(db, "critere", None, crit.categorie_id)
     db.commit()
     db.refresh(crit)
+    reference_cache.invalidate_criteres(crit.categorie_id)
+    validation_index.index.add_critere(crit.id, crit.categorie_id, crit.valeur_max)
     return crit
 
 @router.get("/by_category/{categorie_id}", response_model=list[schemas.CritereOut])
 def crits_by_cat(categorie_id: int, db: Session = Depends(get_db)):
-    return db.query(models.Critere).filter(models.Critere.categorie_id == categorie_id).all()
+    columns = serialization.schema_columns(models.Critere, schemas.CritereOut)
+    return serialization.respond(reference_cache.CRITERES.get_or_load(categorie_id, lambda: serialization.as_dicts(
+        db.query(*columns).filter(models.Critere.categorie_id == categorie_id).all(), columns
+    )))
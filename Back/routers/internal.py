@@ -0,0 +1,102 @@
+# backend/routers/internal.py
+"""Endpoints d'exploitation (à ne pas exposer publiquement)"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from .. import database
+from ..utils import (hashing, cache, leaderboard, profiling, write_buffer, validation_index, candidate_search,
+                     singleflight, invalidation, etag)
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+@router.get("/db-pool")
+def db_pool_stats():
+    """État et compteurs des pools de connexions de ce worker"""
+    pools = {
+        "primary": {
+            "url": database.engine.url.render_as_string(hide_password=True),
+            **database.pool_metrics.snapshot(database.engine.pool),
+        }
+    }
+    if database.async_engine is not None:
+        pools["async"] = {
+            "url": database.async_engine.url.render_as_string(hide_password=True),
+            **database.async_pool_metrics.snapshot(database.async_engine.sync_engine.pool),
+        }
+    for name, engine, metrics in database.replica_engines + database.async_replica_engines:
+        pool = getattr(engine, "sync_engine", engine).pool
+        pools[name] = {"url": engine.url.render_as_string(hide_password=True), **metrics.snapshot(pool)}
+    return {
+        "config": {
+            "pool_size": database.DB_POOL_SIZE,
+            "max_overflow": database.DB_MAX_OVERFLOW,
+            "pool_timeout": database.DB_POOL_TIMEOUT,
+            "pool_recycle": database.DB_POOL_RECYCLE,
+            "pool_pre_ping": database.DB_POOL_PRE_PING,
+        },
+        "pools": pools,
+    }
+
+@router.get("/hashing")
+def hashing_stats():
+    """Occupation du pool de processus Argon2"""
+    return hashing.stats()
+
+@router.get("/caches")
+def cache_stats():
+    """Taille et taux de succès des caches en mémoire de ce worker"""
+    return cache.all_stats()
+
+@router.get("/leaderboard")
+def leaderboard_stats():
+    """Nombre d'abonnés SSE par catégorie sur ce worker"""
+    return leaderboard.broker.stats()
+
+@router.get("/write-buffer")
+def write_buffer_stats():
+    """Tampon d'écriture différée des notes (SCORE_WRITE_BEHIND)"""
+    if write_buffer.buffer is None:
+        return {"enabled": False}
+    return write_buffer.buffer.stats()
+
+@router.get("/validation-index")
+def validation_index_stats():
+    """Taille et âge de l'index de validation des notes"""
+    return validation_index.index.stats()
+
+@router.get("/profiles", response_class=PlainTextResponse)
+def slow_request_profiles():
+    """Piles échantillonnées des requêtes les plus lentes (PROFILE_SAMPLING=true)"""
+    if profiling.sampler is None:
+        raise HTTPException(status_code=404, detail="Échantillonnage désactivé (PROFILE_SAMPLING)")
+    return profiling.sampler.dump()
+
+
+@router.get("/candidate-search")
+def candidate_search_stats():
+    """Index de recherche en mémoire (bases autres que Postgres)"""
+    return candidate_search.index.stats()
+
+@router.get("/singleflight")
+def singleflight_stats():
+    """Lectures regroupées : requêtes exécutées, rejointes en cours, servies dans le micro-TTL"""
+    if singleflight.flights is None:
+        return {"enabled": False}
+    return singleflight.flights.stats()
+
+@router.get("/invalidation")
+def invalidation_stats():
+    """Bus d'invalidation entre workers : connexion LISTEN, événements reçus, trous détectés"""
+    return invalidation.listener.stats()
+
+@router.get("/read-routing")
+def read_routing_stats():
+    """Réplicas de lecture : disponibilité, lectures par base, épinglages au primaire après écriture"""
+    stats = database.read_router.stats()
+    if database.async_read_router is not None:
+        stats["async_replicas"] = database.async_read_router.stats()["replicas"]
+    return stats
+
+@router.get("/etags")
+def etag_versions():
+    """Versions par entité servant aux ETags de ce worker"""
+    return etag.versions.stats()
@@ -1,10 +1,14 @@
 # backend/routers/scores.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_db, get_read_db
 from sqlalchemy import func
 from .. import models, database
+from ..utils import (scoring, aggregation, ranking, leaderboard, export, serialization, progress, write_buffer,
+                     validation_index, singleflight, read_routing, etag)
 
 
 
@@ -12,9 +16,20 @@ from .. import models, database
 router = APIRouter(prefix="/scores", tags=["scores"])
 
 @router.post("/criteria-score")
-def add_criteria_score(request: schemas.CriteriaScoreCreate, 
+def add_criteria_score(request: schemas.CriteriaScoreCreate, response: Response,
                        db: Session = Depends(get_db)):
 
+    validation_index.validate(db, request.categorie_id, request.candidat_id, request.jury_id,
+                              [(request.critere_id, request.note)])
+
+    if write_buffer.buffer is not None:
+        # SCORE_WRITE_BEHIND : acquittement immédiat, écriture groupée plus tard
+        write_buffer.buffer.put(request.candidat_id, request.jury_id, request.categorie_id,
+                                request.critere_id, request.note, request.commentaire)
+        read_routing.mark_write()  # relectures sur le primaire : le flush peut précéder la réplication
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Score accepted", "score": request.dict()}
+
     existing_score = db.query(models.CriteriaScore).filter(
         models.CriteriaScore.candidat_id == request.candidat_id,
         models.CriteriaScore.critere_id == request.critere_id,
@@ -24,7 +39,10 @@ def add_criteria_score(request: schemas.CriteriaScoreCreate,
     if existing_score:
         existing_score.note = request.note
         existing_score.commentaire = request.commentaire
+        aggregation.refresh_jury_score(db, existing_score.candidat_id, existing_score.jury_id,
+                                       existing_score.categorie_id)
         db.commit()
+        leaderboard.publish_change(db, existing_score.categorie_id, [existing_score.candidat_id])
         db.refresh(existing_score)
         return {"message": "Score updated", "score": existing_score}
 
@@ -38,43 +56,181 @@ def add_criteria_score(request: schemas.CriteriaScoreCreate,
     )
 
     db.add(new_score)
+    aggregation.refresh_jury_score(db, request.candidat_id, request.jury_id, request.categorie_id)
     db.commit()
+    leaderboard.publish_change(db, request.categorie_id, [request.candidat_id])
     db.refresh(new_score)
 
     return {"message": "Score created", "score": new_score}
 
+@router.delete("/criteria-score/{score_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_criteria_score(score_id: int, db: Session = Depends(get_db)):
+    score = db.query(models.CriteriaScore).filter(models.CriteriaScore.id == score_id).first()
+    if not score:
+        raise HTTPException(status_code=404, detail="Score introuvable")
+
+    if write_buffer.buffer is not None:
+        write_buffer.buffer.discard([(score.candidat_id, score.jury_id, score.critere_id)])
+    db.delete(score)
+    aggregation.refresh_jury_score(db, score.candidat_id, score.jury_id, score.categorie_id)
+    db.commit()
+    leaderboard.publish_change(db, score.categorie_id, [score.candidat_id])
+    return {"message": "Score supprimé avec succès"}
+
+@router.post("/criteria-scores/batch", response_model=schemas.CriteriaScoreBatchOut)
+def add_criteria_scores_batch(request: schemas.CriteriaScoreBatchCreate,
+                              db: Session = Depends(get_db)):
+    """Enregistre toutes les notes d'un jury pour un candidat dans une seule transaction"""
+    validation_index.validate(db, request.categorie_id, request.candidat_id, request.jury_id,
+                              [(s.critere_id, s.note) for s in request.scores])
+    if write_buffer.buffer is not None:
+        # le lot est plus récent que les notes unitaires en attente sur les mêmes critères
+        write_buffer.buffer.discard([(request.candidat_id, request.jury_id, s.critere_id) for s in request.scores])
+    rows = scoring.upsert_criteria_scores(
+        db,
+        candidat_id=request.candidat_id,
+        jury_id=request.jury_id,
+        categorie_id=request.categorie_id,
+        notes=[s.dict() for s in request.scores],
+    )
+    db.commit()
+    leaderboard.publish_change(db, request.categorie_id, [request.candidat_id])
+
+    created = sum(1 for r in rows if r["status"] == "created")
+    return {"created": created, "updated": len(rows) - created, "scores": rows}
+
 # backend/routers/scores.py
+@router.get("/criteria-scores/{jury_id}/{categorie_id}")
+def get_jury_criteria_scores(jury_id: int, categorie_id: int, db: Session = Depends(get_read_db)):
+    """Notes par critère d'un jury dans une catégorie, y compris celles encore en attente d'écriture"""
+    cs = models.CriteriaScore
+    notes = {
+        (r.candidat_id, r.critere_id): {"note": float(r.note), "commentaire": r.commentaire}
+        for r in db.query(cs.candidat_id, cs.critere_id, cs.note, cs.commentaire)
+        .filter(cs.jury_id == jury_id, cs.categorie_id == categorie_id)
+    }
+    if write_buffer.buffer is not None:
+        for key, value in write_buffer.buffer.pending_for(jury_id, categorie_id).items():
+            notes[key] = {"note": value["note"], "commentaire": value["commentaire"]}
+    return serialization.respond([
+        {"candidat_id": candidat_id, "critere_id": critere_id, **value}
+        for (candidat_id, critere_id), value in sorted(notes.items())
+    ])
+
 @router.get("/jury-scores/{candidat_id}/{categorie_id}")
 def get_jury_scores(candidat_id: int, categorie_id: int, db: Session = Depends(get_db)):
+    # primaire : les notes en attente y sont écrites juste avant la lecture
+    if write_buffer.buffer is not None:
+        write_buffer.buffer.flush(lambda key, value: key[0] == candidat_id and value["categorie_id"] == categorie_id)
     scores = db.query(models.JuryScore).filter(
         models.JuryScore.candidat_id == candidat_id,
         models.JuryScore.categorie_id == categorie_id
     ).all()
     return scores
 
-@router.get("/final_scores/{categorie_id}")
-def get_final_scores_by_category(categorie_id: int, db: Session = Depends(get_db)):
-    rows = (
-        db.query(models.FinalScore, models.Candidat)
-        .join(models.Candidat, models.FinalScore.candidat_id == models.Candidat.id)
-        .filter(models.FinalScore.categorie_id == categorie_id)
-        .all()
+@router.post("/rebuild/{categorie_id}")
+def rebuild_category_scores(categorie_id: int, db: Session = Depends(get_db)):
+    """Admin : recalcule JuryScore et FinalScore d'une catégorie depuis les notes brutes"""
+    categorie = db.query(models.Category).filter(models.Category.id == categorie_id).first()
+    if not categorie:
+        raise HTTPException(status_code=404, detail="Catégorie introuvable")
+
+    if write_buffer.buffer is not None:
+        write_buffer.buffer.flush(lambda key, value: value["categorie_id"] == categorie_id)
+    counts = aggregation.rebuild_category(db, categorie_id)
+    db.commit()
+    leaderboard.publish_change(db, categorie_id)
+    return {"message": "Scores recalculés ✅", **counts}
+
+@router.get("/final_scores/{categorie_id}", dependencies=[etag.conditional("scores:{categorie_id}", "candidats")])
+def get_final_scores_by_category(categorie_id: int, db: Session = Depends(get_read_db)):
+    # lectures simultanées regroupées : la session n'ouvre une connexion que pour l'appel qui exécute ;
+    # une par base, pour qu'un client épinglé au primaire ne reçoive pas le résultat d'un réplica
+    return singleflight.respond(("final_scores", categorie_id, read_routing.source(db)),
+                                lambda: leaderboard.final_score_rows(db, categorie_id))
+
+@router.get("/progress/{categorie_id}")
+def get_scoring_progress(categorie_id: int, db: Session = Depends(get_read_db)):
+    """
+    Matrice d'avancement jurys × candidats : notes[i][j] = critères notés par
+    jurys[i] pour candidats[j], sur nb_criteres.
+    """
+    return singleflight.respond(("progress", categorie_id, read_routing.source(db)), lambda: progress.completion_matrix(db, categorie_id))
+
+@router.get("/final_scores/{categorie_id}/stream")
+async def stream_final_scores(categorie_id: int, request: Request):
+    """Flux SSE : événement `snapshot` puis `update` (lignes modifiées) à chaque écriture de note"""
+    return StreamingResponse(
+        leaderboard.sse_stream(categorie_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    results = []
-    for fs, c in rows:
-        results.append({
-            "candidat_id": fs.candidat_id,
-            "nom_candidat": c.nom,
-            "prenom_candidat": getattr(c, "prenom", ""),  # au cas où champ manquant
-            "email": getattr(c, "email", ""),
-            "projet": getattr(c, "projet", None) or getattr(c, "nom_projet", None) or "",
-            "note_finale": float(fs.note_finale),
-            "nb_jury": fs.nb_jury,
-        })
 
-    return results
+@router.get("/export")
+def export_scores(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    detail: bool = Query(False, description="Notes par critère (avec commentaires) au lieu des scores finaux"),
+    categorie_id: Optional[int] = Query(None, description="Limiter l'export à une catégorie"),
+):
+    """Export en flux des scores finaux de toutes les catégories, ou du détail par critère"""
+    stmt = (export.criteria_scores_statement(categorie_id) if detail
+            else export.final_scores_statement(categorie_id))
+    filename = f"{'criteria_scores' if detail else 'final_scores'}.{format}"
+    return StreamingResponse(
+        export.stream_rows(stmt, format),
+        media_type="text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
+@router.get("/ranking/{categorie_id}")
+def get_ranking_by_category(
+    categorie_id: int,
+    zscore: bool = Query(False, description="Corrige la sévérité de chaque jury (z-score)"),
+    trim: float = Query(0.0, ge=0.0, lt=0.5, description="Part des notes jury retirée à chaque extrémité"),
+    db: Session = Depends(get_read_db),
+):
+    """Classement d'une catégorie calculé depuis les notes brutes normalisées par valeur_max"""
+    def load():
+        candidat_ids, jury_ids, critere_ids, tensor = ranking.load_matrix(db, categorie_id)
+        if len(candidat_ids) == 0:
+            return {"categorie_id": categorie_id, "nb_candidats": 0, "nb_jurys": 0, "nb_criteres": 0,
+                    "kendall_w": None, "nb_jurys_w": 0, "classement": []}
+
+        result = ranking.compute_ranking(tensor, candidat_ids, zscore=zscore, trim=trim)
+
+        noms = {
+            c.id: c
+            for c in db.query(models.Candidat.id, models.Candidat.nom, models.Candidat.prenom)
+            .filter(models.Candidat.id.in_(candidat_ids.tolist()))
+        }
+
+        classement = []
+        for i in result["order"].tolist():
+            cid = int(candidat_ids[i])
+            c = noms.get(cid)
+            classement.append({
+                "candidat_id": cid,
+                "nom_candidat": c.nom if c else "",
+                "prenom_candidat": c.prenom if c else "",
+                "score": round(float(result["scores"][i]), 4),
+                "nb_jury": int(result["nb_jury"][i]),
+                "rang": int(result["ordinal"][i]),
+                "rang_dense": int(result["dense"][i]),
+                "rang_fractionnaire": float(result["fractional"][i]),
+            })
+
+        return {
+            "categorie_id": categorie_id,
+            "nb_candidats": len(candidat_ids),
+            "nb_jurys": len(jury_ids),
+            "nb_criteres": len(critere_ids),
+            "kendall_w": result["kendall_w"],
+            "nb_jurys_w": result["nb_jurys_w"],
+            "classement": classement,
+        }
+
+    return singleflight.respond(("ranking", categorie_id, zscore, trim, read_routing.source(db)), load)
 
 # @router.get("/by_category/{categorie_id}")
 # def get_final_scores_by_category(categorie_id: int, db: Session = Depends(get_db)):
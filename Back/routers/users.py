@@ -1,30 +1,43 @@
 # backend/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from Back.utils import security
-from ..database import get_db
-# from ..routers.auth import get_current_user
+from Back.utils import hashing, pagination, etag
+from ..database import get_db, get_read_db
+from ..routers.auth import get_current_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-@router.post("/", response_model=schemas.UserOut)
-def create_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user_in.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email déjà utilisé")
-    hashed = security.hash_password(user_in.mot_de_passe)
-    user = models.User(nom=user_in.nom, email=user_in.email, mot_de_passe=hashed, role=user_in.role)
+def _email_exists(db: Session, email: str) -> bool:
+    return db.query(models.User.id).filter(models.User.email == email).first() is not None
+
+def _save_user(db: Session, user: models.User) -> models.User:
     db.add(user)
     db.commit()
     db.refresh(user)
     return user
 
-@router.get("/", response_model=list[schemas.UserOut])
-def list_users(db: Session = Depends(get_db)):
-    return db.query(models.User).all()
+@router.post("/", response_model=schemas.UserOut)
+async def create_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_email_exists, db, user_in.email):
+        raise HTTPException(status_code=400, detail="Email déjà utilisé")
+    hashed = await hashing.hash_password(user_in.mot_de_passe)
+    user = models.User(nom=user_in.nom, email=user_in.email, mot_de_passe=hashed, role=user_in.role)
+    return await run_in_threadpool(_save_user, db, user)
+
+@router.get("/", response_model=list[schemas.UserOut], dependencies=[etag.conditional("users")])
+def list_users(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_LIMIT),
+    after: Optional[int] = Query(None, description="Curseur : id du dernier élément reçu"),
+    fields: Optional[str] = Query(None, description="Colonnes à renvoyer, ex. nom,email"),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    db: Session = Depends(get_read_db),
+):
+    return pagination.list_page(db, models.User, schemas.UserOut, response, limit, after, fields, count)
 
-# @router.get("/me", response_model=schemas.UserOut)
-# def get_me(current_user: schemas.UserOut = Depends(get_current_user), db: Session = Depends(get_db)):
-#     user = db.query(models.User).filter(models.User.id == current_user.id).first()
-#     return user
\ No newline at end of file
+@router.get("/me", response_model=schemas.UserOut)
+def get_me(current_user: schemas.UserOut = Depends(get_current_user)):
+    return current_user
\ No newline at end of file
@@ -1,6 +1,7 @@
 # backend/schemas.py
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
+from datetime import datetime
 
 # --- Users ---
 class UserCreate(BaseModel):
@@ -42,7 +43,7 @@ class CandidatCreate(CandidatBase):
 
 class CandidatOut(CandidatBase):
     id: int
-    date_creation: Optional[str]
+    date_creation: Optional[datetime] = None  # sérialisé en ISO 8601
 
     class Config:
         from_attributes  = True
@@ -77,6 +78,27 @@ class CriteriaScoreCreate(BaseModel):
     note: float
     commentaire: Optional[str] = None
 
+class CriteriaNoteIn(BaseModel):
+    critere_id: int
+    note: float
+    commentaire: Optional[str] = None
+
+class CriteriaScoreBatchCreate(BaseModel):
+    candidat_id: int
+    jury_id: int
+    categorie_id: int
+    scores: List[CriteriaNoteIn] = Field(..., min_length=1)
+
+class CriteriaScoreBatchRow(BaseModel):
+    id: int
+    critere_id: int
+    status: str  # 'created' or 'updated'
+
+class CriteriaScoreBatchOut(BaseModel):
+    created: int
+    updated: int
+    scores: List[CriteriaScoreBatchRow]
+
 class CriteriaScoreOut(CriteriaScoreCreate):
     id: int
     date_creation: Optional[str]
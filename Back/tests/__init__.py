@@ -0,0 +1 @@
+# backend/tests/__init__.py
@@ -0,0 +1,138 @@
+# backend/tests/conftest.py
+"""
+Fixtures communes : l'application tourne sur une base SQLite jetable ; les tests
+marqués `postgres` utilisent TEST_POSTGRES_URL (base dédiée, vidée à chaque test)
+et sont ignorés sans elle.
+"""
+import logging
+import os
+import tempfile
+from collections import defaultdict
+
+# avant tout import de Back.database : jamais la base configurée pour l'application
+_TMP = tempfile.mkdtemp(prefix="evaluation-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/app.db"
+os.environ["DB_MODE"] = "sync"
+os.environ.pop("REPLICA_DATABASE_URL", None)
+os.environ.pop("SCORE_WRITE_BEHIND", None)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateTable
+from .. import database, models
+from ..utils import invalidation
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: nécessite TEST_POSTGRES_URL")
+
+
+def _reset_local_state():
+    # caches, index en mémoire et versions d'ETag du test précédent
+    invalidation.flush_all("tests", logging.DEBUG)
+
+
+@pytest.fixture
+def db_engine():
+    """Schéma recréé à vide sur la base SQLite de l'application"""
+    models.Base.metadata.drop_all(database.engine)
+    models.Base.metadata.create_all(database.engine)
+    _reset_local_state()
+    yield database.engine
+    _reset_local_state()
+
+
+@pytest.fixture
+def db(db_engine):
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db_engine):
+    from ..main import app
+    with TestClient(app) as c:
+        yield c
+
+
+def seed_category(session, nb_jurys: int = 3, nb_candidats: int = 4):
+    """Catégorie 1, critères 1 (sur 10) et 2 (sur 20), jurys 1..n et candidats 1..m assignés"""
+    session.add_all([models.User(id=j, nom=f"Jury {j}", email=f"jury{j}@example.com", mot_de_passe="x",
+                                 role="jury") for j in range(1, nb_jurys + 1)])
+    session.add_all([models.Candidat(id=c, nom=f"Nom{c}", prenom=f"Prenom{c}", email=f"candidat{c}@example.com")
+                     for c in range(1, nb_candidats + 1)])
+    session.add(models.Category(id=1, nom="Innovation"))
+    session.flush()
+    session.add_all([models.Critere(id=1, categorie_id=1, nom="Impact", valeur_max=10),
+                     models.Critere(id=2, categorie_id=1, nom="Faisabilité", valeur_max=20)])
+    session.add_all([models.CategoryJury(jury_id=j, categorie_id=1) for j in range(1, nb_jurys + 1)])
+    session.add_all([models.CandidateCategory(candidat_id=c, categorie_id=1) for c in range(1, nb_candidats + 1)])
+    session.commit()
+
+
+def assert_aggregates(db):
+    """jury_scores = somme des notes par (candidat, jury, catégorie) ; final_scores = moyenne des jurys"""
+    db.expire_all()
+    totals = defaultdict(float)
+    for s in db.query(models.CriteriaScore):
+        totals[(s.candidat_id, s.jury_id, s.categorie_id)] += float(s.note)
+    jury = {(r.candidat_id, r.jury_id, r.categorie_id): float(r.note_totale) for r in db.query(models.JuryScore)}
+    assert jury == pytest.approx(totals)
+
+    par_candidat = defaultdict(list)
+    for (candidat_id, _, categorie_id), total in totals.items():
+        par_candidat[(candidat_id, categorie_id)].append(total)
+    final = {(r.candidat_id, r.categorie_id): (float(r.note_finale), r.nb_jury) for r in db.query(models.FinalScore)}
+    assert set(final) == set(par_candidat)
+    for key, notes in par_candidat.items():
+        assert final[key][0] == pytest.approx(sum(notes) / len(notes))
+        assert final[key][1] == len(notes)
+
+
+@pytest.fixture
+def seeded(db):
+    seed_category(db)
+    _reset_local_state()  # écrit hors de l'API : l'index de validation doit être relu
+    return db
+
+
+@pytest.fixture
+def pg_engine():
+    """Schéma recréé à vide sur TEST_POSTGRES_URL"""
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL non défini")
+    engine = create_engine(TEST_POSTGRES_URL)
+    models.Base.metadata.drop_all(engine)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        trgm = True
+    except DBAPIError:
+        trgm = False
+    # DDL table par table : sans pg_trgm, seul l'index trigramme est omis
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+            for index in table.indexes:
+                if trgm or index.name != "ix_candidats_recherche_trgm":
+                    conn.execute(CreateIndex(index))
+    yield engine
+    engine.dispose()
+
+
+def has_trgm(engine) -> bool:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+@pytest.fixture
+def pg_session(pg_engine):
+    session = sessionmaker(bind=pg_engine, autoflush=False)()
+    yield session
+    session.close()
@@ -0,0 +1,109 @@
+# backend/tests/test_aggregation.py
+import threading
+import time
+import pytest
+from sqlalchemy import update
+from .. import models
+from .conftest import assert_aggregates
+
+
+def post_score(client, candidat_id, jury_id, critere_id, note):
+    r = client.post("/scores/criteria-score", json={"candidat_id": candidat_id, "jury_id": jury_id, "categorie_id": 1,
+                                                    "critere_id": critere_id, "note": note})
+    assert r.status_code == 200, r.text
+    return r.json()["score"]["id"]
+
+
+def test_write_and_overwrite(client, seeded):
+    post_score(client, 1, 1, 1, 7)
+    post_score(client, 1, 1, 2, 15.5)
+    post_score(client, 1, 2, 1, 4)
+    assert_aggregates(seeded)
+
+    post_score(client, 1, 1, 1, 9)  # écrase 7
+    post_score(client, 1, 2, 1, 2)
+    assert_aggregates(seeded)
+    assert seeded.query(models.FinalScore).one().note_finale == pytest.approx(((9 + 15.5) + 2) / 2)
+
+
+def test_delete(client, seeded):
+    first = post_score(client, 2, 1, 1, 6)
+    second = post_score(client, 2, 1, 2, 12)
+    only = post_score(client, 2, 3, 1, 8)
+
+    assert client.delete(f"/scores/criteria-score/{first}").status_code == 204
+    assert_aggregates(seeded)
+
+    # dernière note d'un jury : sa ligne jury_scores disparaît, nb_jury baisse
+    assert client.delete(f"/scores/criteria-score/{only}").status_code == 204
+    assert_aggregates(seeded)
+    assert seeded.query(models.FinalScore).one().nb_jury == 1
+
+    # plus aucune note pour le candidat : plus de score final
+    assert client.delete(f"/scores/criteria-score/{second}").status_code == 204
+    assert_aggregates(seeded)
+    assert seeded.query(models.FinalScore).count() == 0
+
+
+def test_batch(client, seeded):
+    body = {"candidat_id": 3, "jury_id": 2, "categorie_id": 1,
+            "scores": [{"critere_id": 1, "note": 5}, {"critere_id": 2, "note": 18}]}
+    r = client.post("/scores/criteria-scores/batch", json=body)
+    assert r.status_code == 200 and r.json()["created"] == 2
+    post_score(client, 3, 1, 1, 10)
+    assert_aggregates(seeded)
+
+    body["scores"] = [{"critere_id": 2, "note": 1}, {"critere_id": 2, "note": 3}]  # la dernière valeur l'emporte
+    r = client.post("/scores/criteria-scores/batch", json=body)
+    assert r.json()["updated"] == 1
+    assert_aggregates(seeded)
+
+
+def test_rebuild(client, seeded):
+    for candidat_id in (1, 2, 3):
+        for jury_id in (1, 2):
+            post_score(client, candidat_id, jury_id, 1, candidat_id + jury_id)
+    # agrégats faussés ou perdus (écriture hors de l'API)
+    seeded.execute(update(models.JuryScore).values(note_totale=0))
+    seeded.query(models.FinalScore).filter(models.FinalScore.candidat_id == 2).delete()
+    seeded.commit()
+
+    r = client.post("/scores/rebuild/1")
+    assert r.status_code == 200
+    assert r.json()["jury_scores"] == 6 and r.json()["final_scores"] == 3
+    assert_aggregates(seeded)
+    assert client.post("/scores/rebuild/99").status_code == 404
+
+
+@pytest.mark.postgres
+def test_concurrent_writes(pg_engine):
+    """Deux transactions concurrentes sur le même jury : aucune ne perd la note de l'autre"""
+    from sqlalchemy.orm import sessionmaker
+    from ..utils import scoring
+    from .conftest import seed_category
+
+    Session = sessionmaker(bind=pg_engine, autoflush=False)
+    with Session() as db:
+        seed_category(db, nb_jurys=2, nb_candidats=1)
+        for jury_id in (1, 2):
+            scoring.upsert_criteria_scores(db, 1, jury_id, 1, [{"critere_id": 1, "note": 5},
+                                                                {"critere_id": 2, "note": 5}])
+        db.commit()
+
+    def write(jury_id, critere_id, note, hold):
+        with Session() as db:
+            scoring.upsert_criteria_scores(db, 1, jury_id, 1, [{"critere_id": critere_id, "note": note}])
+            time.sleep(hold)  # la seconde transaction attend le verrou de l'agrégat pendant ce temps
+            db.commit()
+
+    for plan in ([(1, 1, 7, .3), (1, 1, 9, 0)],    # même note
+                 [(1, 1, 3, .3), (1, 2, 11, 0)],   # autre critère, même jury
+                 [(1, 1, 1, .3), (2, 1, 2, 0)]):   # autre jury, même score final
+        threads = [threading.Thread(target=write, args=args) for args in plan]
+        for t in threads:
+            t.start()
+            time.sleep(.1)
+        for t in threads:
+            t.join()
+        with Session() as db:
+            assert_aggregates(db)
@@ -0,0 +1,50 @@
+# backend/tests/test_candidate_search.py
+import pytest
+from fastapi import Response
+from .. import models
+from ..utils import candidate_search
+from .conftest import has_trgm
+
+CANDIDATS = [
+    (1, "Dupont", "Jean", "Verdure"),
+    (2, "Durand", "Jeanne", "Dupontel"),
+    (3, "Martin", "Paul", "Robotique"),
+    (4, "Dupond", "Marie", None),
+]
+
+
+def seed_candidats(db):
+    db.add_all([models.Candidat(id=c_id, nom=nom, prenom=prenom, projet=projet,
+                                email=f"candidat{c_id}@example.com") for c_id, nom, prenom, projet in CANDIDATS])
+    db.commit()
+
+
+def found(db, q) -> list[int]:
+    response = Response()
+    rows = candidate_search.search(db, q, 20, 0, response)
+    assert response.headers["x-total-count"] == str(len(rows))
+    return [row["id"] for row in rows]
+
+
+def check_rules(db):
+    # préfixe sur chaque mot, toutes colonnes confondues
+    assert found(db, "jean dup") == [1, 2]
+    assert found(db, "robot") == [3]
+    # une faute de frappe : approximation, après les préfixes
+    assert found(db, "dupomt")[0] == 1
+    assert 3 not in found(db, "dupomt")
+    assert found(db, "zzz") == []
+
+
+def test_in_memory_search(db):
+    seed_candidats(db)
+    candidate_search.index.invalidate()
+    check_rules(db)
+
+
+@pytest.mark.postgres
+def test_postgres_search(pg_engine, pg_session):
+    if not has_trgm(pg_engine):
+        pytest.skip("pg_trgm absent de ce serveur")
+    seed_candidats(pg_session)
+    check_rules(pg_session)
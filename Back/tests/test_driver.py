@@ -0,0 +1,24 @@
+# backend/tests/test_driver.py
+import asyncio
+from .. import models
+from ..bench import driver, generator
+from ..utils import write_buffer
+
+
+def test_run_starts_and_stops_the_app(db, monkeypatch):
+    from ..main import app
+    generator.generate(db, generator.SCALES["tiny"], log=lambda *_: None)
+    fixture = driver.load_fixture(db)
+    # pas de flush périodique : seul l'arrêt du lifespan écrit les notes en attente
+    buffer = write_buffer.WriteBuffer(max_entries=10**6, flush_interval=3600)
+    monkeypatch.setattr(write_buffer, "buffer", buffer)
+
+    bench = driver.Driver(app, fixture, concurrency=4, seed=1)
+    calls = [c for c in bench.score_entry(40) if c[2] == "/scores/criteria-score"]
+    asyncio.run(bench.run([("score_entry", calls)], log=lambda *_: None))
+
+    assert {s.status for s in bench.samples} == {202}
+    stats = buffer.stats()
+    assert stats["pending"] == 0 and stats["rows_written"] > 0
+    db.expire_all()
+    assert db.query(models.CriteriaScore).count() > 0
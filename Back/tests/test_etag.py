@@ -0,0 +1,50 @@
+# backend/tests/test_etag.py
+import pytest
+
+
+def create_category(client):
+    assert client.post("/categories/", json={"nom": "Design"}).status_code == 200
+
+
+def create_candidat(client):
+    assert client.post("/candidats/", json={"nom": "Martin", "prenom": "Léa",
+                                            "email": "lea.martin@example.com"}).status_code == 200
+
+
+def create_user(client):
+    assert client.post("/users/", json={"nom": "Jury 9", "email": "jury9@example.com", "mot_de_passe": "secret",
+                                        "role": "jury"}).status_code == 200
+
+
+def post_score(client):
+    assert client.post("/scores/criteria-score", json={"candidat_id": 1, "jury_id": 1, "categorie_id": 1,
+                                                       "critere_id": 1, "note": 8}).status_code == 200
+
+
+@pytest.mark.parametrize("url, write", [
+    ("/categories/", create_category),
+    ("/candidats/", create_candidat),
+    ("/users/", create_user),
+    ("/scores/final_scores/1", post_score),
+    ("/scores/final_scores/1", create_candidat),  # noms des candidats repris dans le classement
+])
+def test_etag_changes_after_write(client, seeded, url, write):
+    r = client.get(url)
+    assert r.status_code == 200
+    tag = r.headers["etag"]
+
+    r = client.get(url, headers={"If-None-Match": tag})
+    assert r.status_code == 304 and r.headers["etag"] == tag and not r.content
+
+    write(client)
+    r = client.get(url, headers={"If-None-Match": tag})
+    assert r.status_code == 200 and r.headers["etag"] != tag
+
+
+def test_etag_ignores_other_entities(client, seeded):
+    tag = client.get("/categories/").headers["etag"]
+    create_user(client)
+    post_score(client)
+    assert client.get("/categories/", headers={"If-None-Match": tag}).status_code == 304
+    # ETag propre à la requête : une autre page n'a pas le même
+    assert client.get("/categories/?limit=1").headers["etag"] != tag
@@ -0,0 +1,37 @@
+# backend/tests/test_explain.py
+import pytest
+from sqlalchemy import text
+from .. import models
+from ..bench import explain, generator
+
+
+def _generate(session):
+    generator.generate(session, generator.SCALES["small"], log=lambda *_: None)
+
+
+def _failures(found):
+    return [(r["name"], r["index"], r["plan"]) for r in found if not r["ok"]]
+
+
+def test_hot_queries_use_their_index(db):
+    _generate(db)
+    found = explain.results(db)
+    assert len(found) == 8
+    assert {r["index"] for r in found} <= set(models.MANAGED_INDEXES)
+    assert _failures(found) == []
+
+
+def test_missing_index_is_reported(db):
+    _generate(db)
+    db.execute(text("DROP INDEX ix_criteres_categorie"))
+    failed = [name for name, _, _ in _failures(explain.results(db))]
+    assert failed == ["critères d'une catégorie"]
+    assert explain.check(db, log=lambda *_: None) is False
+
+
+@pytest.mark.postgres
+def test_hot_queries_use_their_index_postgres(pg_session):
+    _generate(pg_session)
+    pg_session.execute(text("ANALYZE"))
+    pg_session.commit()
+    assert _failures(explain.results(pg_session, strict=True)) == []
@@ -0,0 +1,28 @@
+# backend/tests/test_generator.py
+import pytest
+from .. import models
+from ..bench import generator
+
+
+def _new_rows(db):
+    db.add_all([models.User(nom="Nouveau", email="nouveau@example.com", mot_de_passe="x", role="jury"),
+                models.Candidat(nom="Nouveau", prenom="N", email="nouveau@example.com"),
+                models.Category(nom="Nouvelle")])
+    db.flush()
+    db.add(models.Critere(categorie_id=1, nom="Nouveau", valeur_max=10))
+    db.commit()
+
+
+def test_generate_then_insert(db):
+    counts = generator.generate(db, generator.SCALES["tiny"], log=lambda *_: None)
+    assert counts["criteria_scores"] == db.query(models.CriteriaScore).count() > 0
+    _new_rows(db)
+    assert db.query(models.User).count() == counts["users"] + 1
+
+
+@pytest.mark.postgres
+def test_generate_then_insert_postgres(pg_session):
+    counts = generator.generate(pg_session, generator.SCALES["tiny"], log=lambda *_: None)
+    _new_rows(pg_session)  # sans setval : IntegrityError sur la clé primaire
+    user = pg_session.query(models.User).filter(models.User.email == "nouveau@example.com").one()
+    assert user.id == counts["users"] + 1
@@ -0,0 +1,53 @@
+# backend/tests/test_invalidation.py
+import json
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import NullPool
+from ..utils import invalidation
+
+
+def test_release_only_rewinds_the_last_numbers():
+    sequence = invalidation._Sequence()
+    first = sequence.take(2)
+    sequence.release(first, 2)
+    assert sequence.value == 0
+
+    first = sequence.take(1)
+    sequence.take(1)  # commit concurrent : le numéro rendu n'est plus le dernier
+    sequence.release(first, 1)
+    assert sequence.value == 2
+
+
+@pytest.mark.postgres
+def test_failed_commit_gives_its_sequence_back(pg_engine, pg_session):
+    db = pg_session
+    db.execute(text("DROP TABLE IF EXISTS bus_probe"))
+    # contrainte vérifiée au COMMIT : l'échec survient après l'envoi des pg_notify
+    db.execute(text("CREATE TABLE bus_probe (id int, CONSTRAINT bus_probe_id UNIQUE (id) DEFERRABLE INITIALLY DEFERRED)"))
+    db.commit()
+
+    listen = create_engine(pg_engine.url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    try:
+        with listen.connect() as conn:
+            conn.exec_driver_sql(f"LISTEN {invalidation.INVALIDATION_CHANNEL}")
+            before = invalidation._sequence.value
+
+            db.execute(text("INSERT INTO bus_probe VALUES (1), (1)"))
+            invalidation.publish(db, "categorie", 1, 1)
+            with pytest.raises(IntegrityError):
+                db.commit()
+            db.rollback()
+            assert invalidation._sequence.value == before
+
+            db.execute(text("INSERT INTO bus_probe VALUES (2)"))
+            invalidation.publish(db, "categorie", 2, 2)
+            db.commit()
+
+            # les autres workers voient une séquence sans trou
+            payloads = list(invalidation._notifications(conn.connection.dbapi_connection, 1.0))
+            assert [json.loads(p)["s"] for p in payloads] == [before + 1]
+    finally:
+        listen.dispose()
+        db.execute(text("DROP TABLE bus_probe"))
+        db.commit()
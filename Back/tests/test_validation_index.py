@@ -0,0 +1,60 @@
+# backend/tests/test_validation_index.py
+from .. import models
+from ..utils import validation_index
+
+
+def score(jury_id=1, candidat_id=1, critere_id=1, note=5):
+    return {"candidat_id": candidat_id, "jury_id": jury_id, "categorie_id": 1, "critere_id": critere_id, "note": note}
+
+
+def test_rejections_do_not_reload(client, seeded):
+    index = validation_index.index
+    assert client.post("/scores/criteria-score", json=score()).status_code == 200
+    reloads = index.reloads
+
+    for _ in range(5):
+        assert client.post("/scores/criteria-score", json=score(jury_id=99)).status_code == 403
+        assert client.post("/scores/criteria-score", json=score(note=11)).status_code == 400
+    assert index.reloads == reloads
+    assert index.probes == 10
+
+
+def test_rejected_key_is_read_again(client, seeded):
+    assert client.post("/scores/criteria-score", json=score()).status_code == 200
+    reloads = validation_index.index.reloads
+
+    # modifications faites hors de ce worker : l'index ne les a pas vues
+    seeded.add(models.User(id=9, nom="Jury 9", email="jury9@example.com", mot_de_passe="x", role="jury"))
+    seeded.add(models.CategoryJury(jury_id=9, categorie_id=1))
+    seeded.query(models.Critere).filter_by(id=1).update({"valeur_max": 15})
+    seeded.commit()
+
+    assert client.post("/scores/criteria-score", json=score(jury_id=9)).status_code == 200
+    assert client.post("/scores/criteria-score", json=score(note=14)).status_code == 200
+    assert validation_index.index.reloads == reloads
+
+
+class _SlowSession:
+    """Session dont la première requête laisse passer une autre opération sur l'index"""
+
+    def __init__(self, db, during):
+        self.db, self.during = db, during
+
+    def query(self, *args):
+        if self.during is not None:
+            self.during()
+            self.during = None
+        return self.db.query(*args)
+
+
+def test_changes_during_load_are_kept(seeded):
+    index = validation_index.ValidationIndex()
+    index.load(seeded)
+
+    # assignation faite par ce worker pendant le rechargement : absente du résultat des requêtes
+    index.load(_SlowSession(seeded, lambda: index.add_jury(1, 42)))
+    assert 42 in index.jurys[1]
+    assert not index.stale()
+
+    index.load(_SlowSession(seeded, index.invalidate))
+    assert index.stale()
@@ -0,0 +1,134 @@
+# backend/tests/test_write_buffer.py
+import threading
+import time
+import pytest
+from .. import database, models
+from ..utils import scoring, write_buffer
+from .conftest import assert_aggregates, seed_category
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    # pas de flush périodique : chaque test décide quand écrire
+    buffer = write_buffer.WriteBuffer(max_entries=10**6, flush_interval=3600)
+    monkeypatch.setattr(write_buffer, "buffer", buffer)
+    return buffer
+
+
+def test_put_coalesces_and_pending_for(buffer):
+    assert buffer.put(1, 1, 1, 1, 4, None) is False
+    assert buffer.put(1, 1, 1, 1, 6, "revu") is True  # même clé : seule la dernière valeur reste
+    buffer.put(1, 2, 1, 1, 8, None)
+
+    assert buffer.pending_for(1, 1) == {(1, 1): {"categorie_id": 1, "note": 6, "commentaire": "revu"}}
+    assert buffer.pending_for(1, 2) == {}
+    stats = buffer.stats()
+    assert (stats["pending"], stats["accepted"], stats["coalesced"]) == (2, 3, 1)
+
+
+def test_flush_writes_rows_and_aggregates(seeded, buffer):
+    # ordre d'arrivée quelconque : le flush écrit dans l'ordre des clés
+    for candidat_id in (3, 1, 2):
+        for jury_id in (2, 1):
+            buffer.put(candidat_id, jury_id, 1, 2, candidat_id * jury_id, None)
+            buffer.put(candidat_id, jury_id, 1, 1, jury_id, None)
+    buffer.put(1, 1, 1, 1, 9, None)
+
+    assert buffer.flush(lambda key, value: key[0] == 1) == 4
+    assert buffer.stats()["pending"] == 8
+    assert buffer.flush() == 8
+    assert buffer.pending_for(1, 1) == {}
+    assert seeded.query(models.CriteriaScore).count() == 12
+    assert_aggregates(seeded)
+    assert seeded.query(models.CriteriaScore).filter_by(candidat_id=1, jury_id=1, critere_id=1).one().note == 9
+
+
+def test_read_your_writes(client, seeded, buffer):
+    body = {"candidat_id": 2, "jury_id": 1, "categorie_id": 1, "critere_id": 1, "note": 7}
+    assert client.post("/scores/criteria-score", json=body).status_code == 202
+    assert seeded.query(models.CriteriaScore).count() == 0
+
+    # notes du jury : la valeur en attente est superposée à la base
+    r = client.get("/scores/criteria-scores/1/1")
+    assert [(s["candidat_id"], s["note"]) for s in r.json()] == [(2, 7)]
+
+    # agrégats : les notes du candidat sont écrites avant la lecture
+    r = client.get("/scores/jury-scores/2/1")
+    assert [s["note_totale"] for s in r.json()] == [7]
+    assert buffer.stats()["pending"] == 0
+    assert_aggregates(seeded)
+
+
+def test_shutdown_writes_pending(seeded, buffer):
+    buffer.start()
+    buffer.put(4, 3, 1, 2, 11, None)
+    buffer.put(4, 2, 1, 2, 5, None)
+    buffer.shutdown()
+
+    assert buffer.stats()["pending"] == 0
+    assert seeded.query(models.CriteriaScore).count() == 2
+    assert_aggregates(seeded)
+
+
+@pytest.mark.postgres
+def test_concurrent_flushes_do_not_deadlock(pg_engine, monkeypatch):
+    """
+    Deux workers vident leur tampon en même temps, sur les mêmes candidats mais
+    reçus dans l'ordre inverse : les verrous sont pris dans le même ordre
+    """
+    from sqlalchemy.orm import sessionmaker
+
+    Session = sessionmaker(bind=pg_engine, autoflush=False)
+    monkeypatch.setattr(database, "SessionLocal", Session)
+    with Session() as db:
+        seed_category(db, nb_jurys=2, nb_candidats=2)
+
+    upsert = scoring.upsert_criteria_scores
+
+    def slow_upsert(*args, **kwargs):
+        rows = upsert(*args, **kwargs)
+        time.sleep(.3)  # verrous gardés : l'autre flush a le temps de prendre les siens
+        return rows
+
+    monkeypatch.setattr(scoring, "upsert_criteria_scores", slow_upsert)
+
+    buffers = [write_buffer.WriteBuffer(10**6, 3600) for _ in range(2)]
+    for candidat_id in (2, 1):
+        buffers[0].put(candidat_id, 1, 1, 1, candidat_id, None)
+    for candidat_id in (1, 2):
+        buffers[1].put(candidat_id, 2, 1, 1, candidat_id + 2, None)
+
+    errors = []
+
+    def flush(buffer):
+        try:
+            buffer.flush()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=flush, args=(b,)) for b in buffers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert [b.stats()["rows_written"] for b in buffers] == [2, 2]
+    with Session() as db:
+        assert db.query(models.CriteriaScore).count() == 4
+        assert_aggregates(db)
+
+
+def test_etag_follows_pending_notes(client, seeded, buffer):
+    r = client.get("/scores/final_scores/1")
+    assert r.status_code == 200 and r.json() == []
+    tag = r.headers["etag"]
+
+    body = {"candidat_id": 1, "jury_id": 2, "categorie_id": 1, "critere_id": 2, "note": 13}
+    assert client.post("/scores/criteria-score", json=body).status_code == 202
+
+    # la note en attente est écrite avant le calcul de l'ETag : pas de 304 sur l'ancien classement
+    r = client.get("/scores/final_scores/1", headers={"If-None-Match": tag})
+    assert r.status_code == 200 and r.headers["etag"] != tag
+    assert [(s["candidat_id"], s["note_finale"]) for s in r.json()] == [(1, 13)]
+    assert buffer.stats()["pending"] == 0
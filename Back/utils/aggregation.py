@@ -0,0 +1,115 @@
+# backend/utils/aggregation.py
+"""
+Agrégats JuryScore / FinalScore recalculés par clé depuis les notes, dans la transaction de l'appelant.
+"""
+from decimal import Decimal
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.orm import Session
+from .. import models
+from .dialect import insert_for
+from . import invalidation
+
+
+def to_decimal(value) -> Decimal:
+    """Convertit une note (float de l'API ou Numeric de la base) sans perte d'arrondi"""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _lock(db: Session, model, key: dict, placeholder: dict):
+    """
+    Crée la ligne d'agrégat si besoin et la verrouille jusqu'au commit
+    (upsert sans effet sur une ligne existante) : les recalculs concurrents
+    de la même clé passent l'un après l'autre.
+    """
+    stmt = insert_for(db, model).values(**key, **placeholder)
+    column = next(iter(placeholder))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column: getattr(model, column)},
+    )
+    db.execute(stmt)
+
+
+def refresh_jury_score(db: Session, candidat_id: int, jury_id: int, categorie_id: int, final: bool = True):
+    """
+    Recalcule note_totale d'un jury pour un candidat depuis ses notes, puis le score
+    final (final=False : l'appelant le recalcule lui-même, après tous ses jurys)
+    """
+    db.flush()
+    js = models.JuryScore
+    key = {"candidat_id": candidat_id, "jury_id": jury_id, "categorie_id": categorie_id}
+    _lock(db, js, key, {"note_totale": 0})
+
+    cs = models.CriteriaScore
+    total, nb_notes = db.query(func.sum(cs.note), func.count(cs.id)).filter(
+        cs.candidat_id == candidat_id,
+        cs.jury_id == jury_id,
+        cs.categorie_id == categorie_id,
+    ).one()
+
+    where = (js.candidat_id == candidat_id, js.jury_id == jury_id, js.categorie_id == categorie_id)
+    if nb_notes:
+        db.execute(update(js).where(*where).values(note_totale=to_decimal(total)))
+    else:
+        # Plus aucune note de ce jury pour ce candidat : on retire sa ligne
+        db.execute(delete(js).where(*where))
+
+    if final:
+        refresh_final_score(db, candidat_id, categorie_id)
+
+
+def refresh_final_score(db: Session, candidat_id: int, categorie_id: int):
+    """Recalcule note_finale / nb_jury d'un candidat depuis ses lignes jury_scores"""
+    invalidation.publish(db, "score", candidat_id, categorie_id)
+    fs = models.FinalScore
+    _lock(db, fs, {"candidat_id": candidat_id, "categorie_id": categorie_id}, {"note_finale": 0, "nb_jury": 0})
+
+    total, nb_jury = db.query(
+        func.sum(models.JuryScore.note_totale),
+        func.count(models.JuryScore.id),
+    ).filter(
+        models.JuryScore.candidat_id == candidat_id,
+        models.JuryScore.categorie_id == categorie_id,
+    ).one()
+
+    where = (fs.candidat_id == candidat_id, fs.categorie_id == categorie_id)
+    if not nb_jury:
+        db.execute(delete(fs).where(*where))
+        return
+
+    db.execute(update(fs).where(*where).values(
+        note_finale=to_decimal(total) / nb_jury,
+        nb_jury=nb_jury,
+        updated_at=func.now(),
+    ))
+
+
+def rebuild_category(db: Session, categorie_id: int) -> dict:
+    """Recalcule tous les agrégats d'une catégorie en requêtes ensemblistes"""
+    invalidation.publish(db, "score", None, categorie_id)
+    db.execute(delete(models.JuryScore).where(models.JuryScore.categorie_id == categorie_id))
+    db.execute(delete(models.FinalScore).where(models.FinalScore.categorie_id == categorie_id))
+
+    cs = models.CriteriaScore
+    jury_rows = db.execute(
+        models.JuryScore.__table__.insert().from_select(
+            ["candidat_id", "jury_id", "categorie_id", "note_totale"],
+            select(cs.candidat_id, cs.jury_id, cs.categorie_id, func.sum(cs.note))
+            .where(cs.categorie_id == categorie_id)
+            .group_by(cs.candidat_id, cs.jury_id, cs.categorie_id),
+        )
+    ).rowcount
+
+    js = models.JuryScore
+    final_rows = db.execute(
+        models.FinalScore.__table__.insert().from_select(
+            ["candidat_id", "categorie_id", "note_finale", "nb_jury"],
+            select(js.candidat_id, js.categorie_id, func.avg(js.note_totale), func.count(js.id))
+            .where(js.categorie_id == categorie_id)
+            .group_by(js.candidat_id, js.categorie_id),
+        )
+    ).rowcount
+
+    return {"jury_scores": jury_rows, "final_scores": final_rows}
@@ -0,0 +1,106 @@
+# backend/utils/cache.py
+"""
+Cache en mémoire (par worker) : LRU borné, expiration par entrée, compteurs hit/miss.
+Chaque cache créé est enregistré pour pouvoir être inspecté ou vidé globalement.
+
+Génération : chaque invalidation (pop, clear) l'incrémente. Un lecteur qui
+l'a relevée avant sa requête la passe à set() : si une invalidation est
+survenue pendant le chargement, le résultat (peut-être antérieur à
+l'écriture) n'est pas mis en cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+_MISSING = object()
+_registry: list["TTLCache"] = []
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # clé -> (valeur, expire_à ou None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self.stale_skips = 0
+        _registry.append(self)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, expires_at: Optional[float] = None, generation: Optional[int] = None):
+        """
+        expires_at (timestamp) prime sur le ttl du cache s'il est plus proche.
+        generation : valeur relevée avant le chargement ; rien n'est stocké si
+        le cache a été invalidé depuis.
+        """
+        if self.ttl is not None:
+            ttl_expiry = time.time() + self.ttl
+            expires_at = ttl_expiry if expires_at is None else min(expires_at, ttl_expiry)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale_skips += 1
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader: Callable):
+        """Lecture à travers le cache : `loader()` n'est appelé qu'en cas d'absence"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            generation = self.generation
+            value = loader()
+            self.set(key, value, generation=generation)
+        return value
+
+    def pop(self, key):
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_skips": self.stale_skips,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
+
+
+def all_stats() -> dict:
+    return {c.name: c.stats() for c in _registry}
+
+
+def clear_all():
+    for c in _registry:
+        c.clear()
@@ -0,0 +1,183 @@
+# backend/utils/candidate_import.py
+"""
+Import en flux de candidats (CSV ou NDJSON) avec rattachement optionnel aux catégories.
+
+Le corps de la requête est lu morceau par morceau : seules les lignes du lot
+courant sont en mémoire. Chaque lot est validé avec CandidatCreate puis chargé
+par un INSERT multi-lignes ... ON CONFLICT (email) DO NOTHING ; les emails déjà
+présents (en base ou plus haut dans le fichier) sont signalés comme doublons.
+
+Colonnes attendues : nom, prenom, email, projet, entreprise et, optionnellement,
+categories (noms séparés par « ; » en CSV, chaîne ou liste en NDJSON).
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from .. import models, schemas
+from .dialect import insert_for
+from . import validation_index, candidate_search, invalidation
+
+CATEGORY_SEPARATOR = ";"
+MAX_REPORTED_ERRORS = 1000
+
+
+async def _lines(chunks: AsyncIterator[bytes]):
+    """Découpe le flux d'octets en lignes texte sans le charger entièrement"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]):
+    """(n° de ligne, dict) ; un enregistrement entre guillemets peut couvrir plusieurs lignes"""
+    header = None
+    buffer, start, line_no = [], 0, 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not buffer:
+            start = line_no
+        buffer.append(line)
+        record = "\n".join(buffer)
+        if record.count('"') % 2:
+            continue  # champ entre guillemets encore ouvert
+        buffer = []
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        yield start, dict(zip(header, values))
+    if buffer:
+        yield start, ValueError("Guillemet non fermé en fin de fichier")
+
+
+async def _ndjson_records(chunks: AsyncIterator[bytes]):
+    line_no = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"JSON invalide : {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, ValueError("Objet JSON attendu")
+            continue
+        yield line_no, record
+
+
+def records(chunks: AsyncIterator[bytes], fmt: str):
+    return _csv_records(chunks) if fmt == "csv" else _ndjson_records(chunks)
+
+
+def parse_record(record: dict):
+    """Valide une ligne : (CandidatCreate, noms de catégories)"""
+    data = {k: (v.strip() if isinstance(v, str) else v) for k, v in record.items()}
+    for optional in ("projet", "entreprise"):
+        if data.get(optional) == "":
+            data[optional] = None
+
+    categories = data.pop("categories", None) or []
+    if isinstance(categories, str):
+        categories = [c.strip() for c in categories.split(CATEGORY_SEPARATOR)]
+    categories = list(dict.fromkeys(c for c in categories if c))
+
+    candidat = schemas.CandidatCreate(**{k: data.get(k) for k in schemas.CandidatCreate.model_fields})
+    return candidat, categories
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])} : {e['msg']}" for e in error.errors())
+
+
+class ImportReport:
+    def __init__(self):
+        self.lignes = 0
+        self.inseres = 0
+        self.doublons = 0
+        self.liens = 0
+        self.nb_erreurs = 0
+        self.erreurs: list[dict] = []
+
+    def error(self, ligne: int, message: str, email: Optional[str] = None):
+        self.nb_erreurs += 1
+        if len(self.erreurs) < MAX_REPORTED_ERRORS:
+            self.erreurs.append({"ligne": ligne, "email": email, "erreur": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "lignes": self.lignes,
+            "inseres": self.inseres,
+            "doublons": self.doublons,
+            "liens": self.liens,
+            "nb_erreurs": self.nb_erreurs,
+            "erreurs": self.erreurs,
+        }
+
+
+def category_ids_by_name(db: Session) -> dict[str, int]:
+    return {nom: c_id for c_id, nom in db.query(models.Category.id, models.Category.nom)}
+
+
+def load_chunk(db: Session, rows: list, categories_by_name: dict[str, int], report: ImportReport):
+    """
+    Charge un lot de lignes validées [(n° ligne, CandidatCreate, [catégories])]
+    en deux INSERT multi-lignes (candidats, puis liens), puis commit.
+    """
+    uniques = {}
+    for line_no, candidat, categories in rows:
+        if candidat.email in uniques:
+            report.doublons += 1
+            report.error(line_no, "Email en double dans le fichier", candidat.email)
+            continue
+        uniques[candidat.email] = (line_no, candidat, categories)
+    if not uniques:
+        return
+
+    stmt = insert_for(db, models.Candidat).values([c.dict() for _, c, _ in uniques.values()])
+    stmt = stmt.on_conflict_do_nothing(index_elements=["email"]).returning(
+        models.Candidat.id, models.Candidat.email
+    )
+    inserted = {email: c_id for c_id, email in db.execute(stmt)}
+
+    links = []
+    for email, (line_no, _, categories) in uniques.items():
+        if email not in inserted:
+            report.doublons += 1
+            report.error(line_no, "Email candidat déjà existant", email)
+            continue
+        report.inseres += 1
+        for nom in categories:
+            categorie_id = categories_by_name.get(nom)
+            if categorie_id is None:
+                report.error(line_no, f"Catégorie inconnue : {nom}", email)
+                continue
+            links.append({"candidat_id": inserted[email], "categorie_id": categorie_id})
+
+    if links:
+        link_stmt = insert_for(db, models.CandidateCategory).values(links).on_conflict_do_nothing()
+        db.execute(link_stmt)
+        report.liens += len(links)
+
+    for candidat_id in inserted.values():
+        invalidation.publish(db, "candidat", candidat_id)
+    for l in links:
+        invalidation.publish(db, "assignation", l["candidat_id"], l["categorie_id"])
+    db.commit()
+    validation_index.index.add_candidats((l["categorie_id"], l["candidat_id"]) for l in links)
+    candidate_search.index.add(
+        (inserted[email], candidat.dict()) for email, (_, candidat, _) in uniques.items() if email in inserted
+    )
@@ -0,0 +1,238 @@
+# backend/utils/candidate_search.py
+"""
+Recherche de candidats (GET /candidats/search?q=) par préfixe de mot puis par
+similarité de trigrammes : pg_trgm sur Postgres, index en mémoire ailleurs.
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+from math import ceil
+from typing import Iterable, Optional
+import numpy as np
+from fastapi import Response
+from sqlalchemy import case, func, or_, and_, select, text
+from sqlalchemy.orm import Session
+from .. import models, schemas
+from . import serialization
+
+# part des trigrammes de q à retrouver (word_similarity) ; 0.6 de pg_trgm laisse passer peu de fautes :
+# une lettre changée au milieu d'un mot de 6 lettres n'en garde que 4 sur 7 (« dupomt » / « Dupont »)
+SEARCH_SIMILARITY = float(os.getenv("SEARCH_SIMILARITY", "0.5"))
+CANDIDATE_SEARCH_TTL = float(os.getenv("CANDIDATE_SEARCH_TTL", "300"))
+
+FIELDS = ("nom", "prenom", "email", "projet", "entreprise")
+_WORD = re.compile(r"[^\W_]+")
+
+
+def words(value: Optional[str]) -> list[str]:
+    """Mots alphanumériques en minuscules (les autres caractères séparent, comme pg_trgm)"""
+    return _WORD.findall(value.casefold()) if value else []
+
+
+def trigrams(word_list: Iterable[str]) -> set[str]:
+    """Trigrammes à la manière de pg_trgm : chaque mot encadré de deux blancs devant, un derrière"""
+    found = set()
+    for w in word_list:
+        padded = f"  {w} "
+        found.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+class SearchIndex:
+    """
+    Listes inversées (mot -> positions, trigramme -> positions) en array('i'),
+    lues par numpy sans copie au moment de la recherche. Une position par
+    candidat indexé ; une suppression ou une mise à jour ne fait que marquer
+    l'ancienne position comme morte (le rechargement suivant compacte).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fill([])
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+
+    # ---------- chargement ----------
+
+    def _fill(self, rows):
+        """(Re)construit tout l'index à partir de lignes (candidat_id, *champs)"""
+        self.ids = array("q")             # position -> candidat_id
+        self.alive = bytearray()          # position -> 1 si toujours indexée
+        self.position: dict[int, int] = {}
+        self.by_word: dict[str, array] = defaultdict(lambda: array("i"))
+        self.by_trigram: dict[str, array] = defaultdict(lambda: array("i"))
+        for candidat_id, *values in rows:
+            self._append(candidat_id, values)
+        self.words: list[str] = sorted(self.by_word)  # mots distincts triés (préfixes par bisect)
+
+    def _append(self, candidat_id: int, values) -> list[str]:
+        pos = len(self.ids)
+        self.ids.append(candidat_id)
+        self.alive.append(1)
+        self.position[candidat_id] = pos
+        doc_words = {w for v in values for w in words(v)}
+        new_words = [w for w in doc_words if w not in self.by_word]
+        for w in doc_words:
+            self.by_word[w].append(pos)
+        for t in trigrams(doc_words):
+            self.by_trigram[t].append(pos)
+        return new_words
+
+    def load(self, db: Session):
+        columns = [getattr(models.Candidat, f) for f in FIELDS]
+        fresh = SearchIndex()
+        fresh._fill(db.query(models.Candidat.id, *columns).order_by(models.Candidat.id))
+        with self._lock:
+            self.ids, self.alive, self.position = fresh.ids, fresh.alive, fresh.position
+            self.by_word, self.by_trigram, self.words = fresh.by_word, fresh.by_trigram, fresh.words
+            self.loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.loaded_at = None
+
+    def refresh(self, db: Session, candidat_ids: list[int]) -> list[int]:
+        """Relit ces candidats (modifiés par un autre worker) ; retourne ceux qui n'existent plus"""
+        columns = [getattr(models.Candidat, f) for f in FIELDS]
+        rows = db.query(models.Candidat.id, *columns).filter(models.Candidat.id.in_(candidat_ids)).all()
+        self.add((row[0], dict(zip(FIELDS, row[1:]))) for row in rows)
+        found = {row[0] for row in rows}
+        removed = [c_id for c_id in candidat_ids if c_id not in found]
+        with self._lock:
+            for candidat_id in removed:
+                self._remove(candidat_id)
+        return removed
+
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > CANDIDATE_SEARCH_TTL
+
+    # ---------- mises à jour incrémentales ----------
+
+    def add(self, items: Iterable[tuple[int, dict]]):
+        """items : couples (candidat_id, champs) ; sans effet tant que l'index n'est pas chargé"""
+        if not self.loaded():
+            return
+        with self._lock:
+            for candidat_id, fields in items:
+                self._remove(candidat_id)
+                for w in self._append(candidat_id, [fields.get(f) for f in FIELDS]):
+                    bisect.insort(self.words, w)
+
+    def remove(self, candidat_id: int):
+        with self._lock:
+            self._remove(candidat_id)
+
+    def _remove(self, candidat_id: int):
+        pos = self.position.pop(candidat_id, None)
+        if pos is not None:
+            self.alive[pos] = 0
+
+    # ---------- recherche ----------
+
+    def _positions(self, postings: Iterable[array]) -> np.ndarray:
+        arrays = [np.frombuffer(p, dtype=np.int32) for p in postings]
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int32)
+
+    def _prefixed(self, prefix: str) -> np.ndarray:
+        lo = bisect.bisect_left(self.words, prefix)
+        hi = bisect.bisect_left(self.words, prefix + "\U0010ffff", lo)
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self._positions(self.by_word[w] for w in self.words[lo:hi])] = True
+        return mask
+
+    def search(self, q: str, limit: int, offset: int) -> tuple[int, list[int]]:
+        """(nombre total de résultats, ids de la page dans l'ordre du classement)"""
+        q_words = words(q)
+        if not q_words:
+            return 0, []
+        q_trigrams = trigrams(q_words)
+        needed = ceil(SEARCH_SIMILARITY * len(q_trigrams))
+        with self._lock:
+            prefixed = self._prefixed(q_words[0])
+            for w in q_words[1:]:
+                prefixed &= self._prefixed(w)
+            found = self._positions(self.by_trigram[t] for t in q_trigrams if t in self.by_trigram)
+            shared = np.bincount(found, minlength=len(self.ids))
+            alive = np.frombuffer(self.alive, dtype=bool).copy()
+            ids = np.frombuffer(self.ids, dtype=np.int64).copy()
+
+        matched = np.flatnonzero(alive & (prefixed | (shared >= needed)))
+        # clé de tri : préfixe d'abord, puis trigrammes communs décroissants, puis id
+        key = ((~prefixed[matched]).astype(np.int64) << 40
+               | (255 - np.minimum(shared[matched], 255)).astype(np.int64) << 32
+               | ids[matched])
+        top = min(offset + limit, len(key))
+        if top < len(key):
+            key = key[np.argpartition(key, top - 1)[:top]]
+        page = np.sort(key)[offset:top] & 0xFFFFFFFF
+        return len(matched), page.tolist()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "candidats": len(self.position),
+                "positions": len(self.ids),
+                "mots": len(self.words),
+                "trigrammes": len(self.by_trigram),
+                "age_seconds": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1),
+                "reloads": self.reloads,
+            }
+
+
+index = SearchIndex()
+
+
+def _postgres_search(db: Session, q: str, limit: int, offset: int) -> tuple[int, list]:
+    columns = [getattr(models.Candidat, f) for f in FIELDS]
+    out = serialization.schema_columns(models.Candidat, schemas.CandidatOut)
+    # mots alphanumériques uniquement : rien à échapper dans la regex
+    prefixed = and_(*(or_(*(c.op("~*")(r"\m" + w) for c in columns)) for w in words(q)))
+    match = or_(prefixed, *(c.op("%>")(q) for c in columns))
+    similarity = func.greatest(*(func.coalesce(func.word_similarity(q, c), 0) for c in columns))
+
+    db.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)"),
+               {"t": str(SEARCH_SIMILARITY)})
+    rows = db.execute(
+        select(*out, func.count().over().label("total"))
+        .where(match)
+        .order_by(case((prefixed, 1), else_=0).desc(), similarity.desc(), models.Candidat.id)
+        .limit(limit).offset(offset)
+    ).all()
+    if rows:
+        return rows[0].total, [row[:-1] for row in rows]
+    if not offset:
+        return 0, []
+    # page au-delà de la fin : le total ne peut pas venir de la fenêtre
+    return db.execute(select(func.count()).select_from(models.Candidat).where(match)).scalar(), []
+
+
+def search(db: Session, q: str, limit: int, offset: int, response: Response):
+    """Page de résultats classés et en-têtes X-Total-Count / X-Next-Offset"""
+    columns = serialization.schema_columns(models.Candidat, schemas.CandidatOut)
+    if not words(q):
+        total, rows = 0, []
+    elif db.get_bind().dialect.name == "postgresql":
+        total, rows = _postgres_search(db, q, limit, offset)
+    else:
+        if index.stale():
+            index.load(db)
+        total, ids = index.search(q, limit, offset)
+        by_id = {row.id: row for row in db.query(*columns).filter(models.Candidat.id.in_(ids))} if ids else {}
+        rows = [by_id[c_id] for c_id in ids if c_id in by_id]
+
+    headers = {"X-Total-Count": str(total)}
+    if offset + len(rows) < total:
+        headers["X-Next-Offset"] = str(offset + len(rows))
+    content = serialization.as_dicts(rows, columns)
+    if serialization.fast():
+        return serialization.FastJSONResponse(content, headers=headers)
+    response.headers.update(headers)
+    return content
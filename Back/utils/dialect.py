@@ -0,0 +1,9 @@
+# backend/utils/dialect.py
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_for(db, model):
+    """Retourne un INSERT supportant ON CONFLICT pour le dialecte de la session"""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
@@ -0,0 +1,191 @@
+# backend/utils/etag.py
+"""ETags des lectures de tableaux de bord : versions par entité avancées à chaque commit, 304 sans requête SQL"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Iterable, Optional
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from .. import database
+from . import invalidation, read_routing, reference_cache, singleflight, write_buffer
+
+logger = logging.getLogger("evaluation.etag")
+
+ETAG_TTL = float(os.getenv("ETAG_TTL", "300"))
+
+CACHE_CONTROL = "private, no-cache"  # le navigateur garde la réponse mais revalide à chaque visite
+
+
+def _shared_base() -> int:
+    """Version de départ commune aux workers (voir Back/README.md)"""
+    if database.engine.dialect.name == "postgresql":
+        try:
+            with database.engine.connect() as conn:
+                return conn.execute(text("SELECT txid_snapshot_xmax(txid_current_snapshot())")).scalar_one()
+        except DBAPIError as e:
+            logger.warning("Base des ETags non lue, horodatage local à la place : %s", e)
+    return time.time_ns()
+
+
+class Versions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.base: Optional[int] = None     # version des entités jamais modifiées, lue au premier usage
+        self.values: dict[str, int] = {}
+        self.advanced_at: dict[str, float] = {}
+        self.base_advanced_at = 0.0
+
+    def seed(self, base: int, reset: bool = False):
+        """
+        reset=True : les versions par entité retombent sur la nouvelle base, plus
+        récente que tout commit déjà vu (elle ne reprend donc aucune version servie).
+        """
+        with self._lock:
+            if self.base is not None and base > self.base:
+                self.base_advanced_at = time.monotonic()
+            self.base = base if self.base is None else max(self.base, base)
+            if reset:
+                self.values.clear()
+
+    def get(self, key: str) -> int:
+        if self.base is None:
+            self.seed(_shared_base())
+        return self.values.get(key, self.base)
+
+    def advance(self, keys: Iterable[str], stamp: int):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self.values[key] = max(self.values.get(key, self.base or 0), stamp)
+                self.advanced_at[key] = now
+
+    def advance_all(self, stamp: int):
+        """Tout a pu changer (vidage complet des caches) : toutes les versions avancent"""
+        with self._lock:
+            self.base = max(self.base or 0, stamp)
+            self.values = {key: max(value, stamp) for key, value in self.values.items()}
+            self.advanced_at.clear()
+            self.base_advanced_at = time.monotonic()
+
+    def recent(self, keys: Iterable[str], seconds: float) -> bool:
+        limit = time.monotonic() - seconds
+        return self.base_advanced_at > limit or any(self.advanced_at.get(key, 0.0) > limit for key in keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"base": self.base, "versions": dict(sorted(self.values.items()))}
+
+
+versions = Versions()
+
+
+def _keys(events: list[tuple]) -> set[str]:
+    keys = set()
+    for entity, _, categorie_id in events:
+        if entity == "categorie":
+            keys.add("categories")
+            if categorie_id is not None:  # suppression : ses scores disparaissent
+                keys.add(f"scores:{categorie_id}")
+        elif entity == "candidat":
+            keys.add("candidats")  # noms repris dans les scores finaux de toutes les catégories
+        elif entity == "user":
+            keys.add("users")
+        elif entity == "score":
+            keys.add(f"scores:{categorie_id}")
+    return keys
+
+
+def _record(events: list[tuple], stamp: int):
+    keys = _keys(events)
+    if not keys:
+        return
+    # Un lecteur qui voit la nouvelle version ne peut plus recevoir le résultat
+    # précédent : les chargements commencés avant ce vidage ne sont pas remis en
+    # cache (génération de TTLCache) et singleflight.forget retire les appels en
+    # cours. Les routeurs vident aussi après le commit.
+    if "categories" in keys:
+        reference_cache.invalidate_categories()
+    if "candidats" in keys:
+        singleflight.clear()
+    for key in keys:
+        if key.startswith("scores:"):
+            singleflight.forget_category(int(key.split(":", 1)[1]))
+    versions.advance(keys, stamp)
+
+
+invalidation.watch(_record)
+
+
+def _flushed(initial: bool):
+    if initial:
+        # LISTEN établi : tout commit antérieur est dans la base relue, les suivants arriveront par le bus
+        versions.seed(_shared_base(), reset=True)
+    else:
+        versions.advance_all(invalidation.stamp())
+
+
+invalidation.on_flush(_flushed)
+
+
+def compute(keys: list[str], request: Request) -> str:
+    parts = [request.url.path, request.url.query]
+    parts += [f"{key}={versions.get(key)}" for key in keys]
+    if ETAG_TTL > 0:
+        parts.append(str(int(time.time() // ETAG_TTL)))
+    return '"' + hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest() + '"'
+
+
+def _matches(header: str, tag: str) -> bool:
+    # comparaison faible, comme le veut If-None-Match
+    return any(candidate.strip().removeprefix("W/") in (tag, "*") for candidate in header.split(","))
+
+
+def conditional(*keys: str):
+    """
+    Dépendance : 304 si If-None-Match correspond à l'ETag courant. Les clés
+    peuvent citer les paramètres de chemin, ex. "scores:{categorie_id}".
+    """
+    def check(request: Request):
+        resolved = [key.format(**request.path_params) for key in keys]
+        if write_buffer.buffer is not None:
+            # notes en attente écrites d'abord : leur commit avance la version avant le calcul de l'ETag
+            categories = {int(key.split(":", 1)[1]) for key in resolved if key.startswith("scores:")}
+            if categories:
+                write_buffer.buffer.flush(lambda key, value: value["categorie_id"] in categories)
+        if (database.REPLICA_DATABASE_URLS and not read_routing.pinned()
+                and versions.recent(resolved, read_routing.READ_AFTER_WRITE_WINDOW)):
+            return
+        tag = compute(resolved, request)
+        header = request.headers.get("if-none-match")
+        if header and _matches(header, tag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED,
+                                headers={"ETag": tag, "Cache-Control": CACHE_CONTROL})
+        request.state.etag = tag
+
+    return Depends(check)
+
+
+class ETagMiddleware:
+    """Middleware ASGI pur : ajoute l'ETag calculé par conditional() aux réponses 200"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                tag = scope.get("state", {}).get("etag")
+                if tag is not None:
+                    message["headers"] = [*message.get("headers", []),
+                                          (b"etag", tag.encode("latin-1")),
+                                          (b"cache-control", CACHE_CONTROL.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,94 @@
+# backend/utils/export.py
+"""
+Export en flux des résultats (CSV / NDJSON) via un curseur côté serveur :
+les lignes sont lues par paquets de EXPORT_BATCH et écrites au fil de l'eau,
+la mémoire reste constante quel que soit le volume.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from .. import models, database
+
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", "2000"))
+
+
+def final_scores_statement(categorie_id: Optional[int] = None):
+    fs, c, cat = models.FinalScore, models.Candidat, models.Category
+    stmt = (
+        select(
+            cat.id.label("categorie_id"), cat.nom.label("categorie"),
+            fs.candidat_id, c.nom.label("nom_candidat"), c.prenom.label("prenom_candidat"),
+            c.email, c.projet, fs.note_finale, fs.nb_jury, fs.updated_at,
+        )
+        .join(c, c.id == fs.candidat_id)
+        .join(cat, cat.id == fs.categorie_id)
+        .order_by(cat.id, fs.note_finale.desc(), fs.candidat_id)
+    )
+    if categorie_id is not None:
+        stmt = stmt.where(fs.categorie_id == categorie_id)
+    return stmt
+
+
+def criteria_scores_statement(categorie_id: Optional[int] = None):
+    cs, c, cat, crit = models.CriteriaScore, models.Candidat, models.Category, models.Critere
+    jury = aliased(models.User)
+    stmt = (
+        select(
+            cat.id.label("categorie_id"), cat.nom.label("categorie"),
+            cs.candidat_id, c.nom.label("nom_candidat"), c.prenom.label("prenom_candidat"),
+            cs.jury_id, jury.nom.label("nom_jury"),
+            cs.critere_id, crit.nom.label("critere"), crit.valeur_max,
+            cs.note, cs.commentaire, cs.date_creation,
+        )
+        .join(c, c.id == cs.candidat_id)
+        .join(cat, cat.id == cs.categorie_id)
+        .join(crit, crit.id == cs.critere_id)
+        .join(jury, jury.id == cs.jury_id)
+        .order_by(cs.categorie_id, cs.candidat_id, cs.jury_id, cs.critere_id)
+    )
+    if categorie_id is not None:
+        stmt = stmt.where(cs.categorie_id == categorie_id)
+    return stmt
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(stmt, fmt: str):
+    """Générateur d'octets ; ouvre sa propre session, fermée en fin (ou abandon) de flux"""
+    db = database.read_router.session(database.SessionLocal)
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+
+        for partition in result.partitions():
+            for row in partition:
+                values = [_plain(v) for v in row]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
@@ -0,0 +1,72 @@
+# backend/utils/hashing.py
+"""
+Hachage / vérification Argon2 hors des threads de requête.
+
+Argon2 est volontairement coûteux en CPU et en mémoire : lors de la connexion
+simultanée de tous les jurys, l'exécuter dans les handlers affame les autres
+endpoints. Les appels partent donc dans un pool de processus dédié, avec :
+- HASH_WORKERS : nombre de hachages simultanés (taille du pool) ;
+- HASH_MAX_QUEUE : nombre d'appels en attente au-delà duquel on répond 503 ;
+- HASH_RETRY_AFTER : valeur (s) de l'en-tête Retry-After de ce 503.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from . import security
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", "64"))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", "2"))
+
+_executor = None
+_lock = threading.Lock()
+_pending = 0  # appels en cours + en attente
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+        return _executor
+
+
+async def _run(fn, *args):
+    global _pending
+    with _lock:
+        if _pending >= HASH_WORKERS + HASH_MAX_QUEUE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Serveur d'authentification saturé, réessayez",
+                headers={"Retry-After": str(HASH_RETRY_AFTER)},
+            )
+        _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(security.hash_password, password)
+
+
+async def verify_and_rehash(plain: str, hashed: str):
+    """(mot de passe valide ?, nouveau hash si les paramètres Argon2 sont obsolètes)"""
+    return await _run(security.verify_and_rehash, plain, hashed)
+
+
+def stats() -> dict:
+    return {"workers": HASH_WORKERS, "max_queue": HASH_MAX_QUEUE, "pending": _pending}
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,384 @@
+# backend/utils/invalidation.py
+"""Bus d'invalidation des caches locaux entre workers (Postgres LISTEN/NOTIFY)"""
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Optional
+from sqlalchemy import create_engine, event, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from .. import database
+from . import cache, reference_cache, validation_index, candidate_search, singleflight, leaderboard
+
+logger = logging.getLogger("evaluation.invalidation")
+
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "true").lower() in ("1", "true", "yes")
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "evaluation_invalidation")
+INVALIDATION_GAP_GRACE = float(os.getenv("INVALIDATION_GAP_GRACE", "5"))
+INVALIDATION_RECONNECT_MAX = float(os.getenv("INVALIDATION_RECONNECT_MAX", "30"))
+INVALIDATION_HEARTBEAT = float(os.getenv("INVALIDATION_HEARTBEAT", "30"))
+
+PAYLOAD_LIMIT = 7500  # NOTIFY refuse les charges de plus de 8000 octets
+_PENDING = "invalidation_events"
+_STAMP = "invalidation_stamp"
+_SEQUENCE = "invalidation_sequence"
+
+ORIGIN = uuid.uuid4().hex[:12]  # identifie ce worker dans les notifications
+
+# Réactions aux événements hors du paquet utils (ex. cache des utilisateurs de routers/auth.py)
+_subscribers: dict[str, list[Callable]] = defaultdict(list)
+_flush_hooks: list[Callable[[bool], None]] = []
+_watchers: list[Callable[[list[tuple], int], None]] = []
+
+
+def subscribe(entity: str, handler: Callable[[list[tuple]], None]):
+    """handler(events) : liste de (entité, id, categorie_id) reçus d'un autre worker"""
+    _subscribers[entity].append(handler)
+
+
+def on_flush(hook: Callable[[bool], None]):
+    """hook(initial) : vidage complet ; initial=True au premier LISTEN du worker (rien de manqué, rien d'écouté avant)"""
+    _flush_hooks.append(hook)
+
+
+def watch(hook: Callable[[list[tuple], int], None]):
+    """hook(events, stamp) : événements commités par ce worker ou reçus d'un autre"""
+    _watchers.append(hook)
+
+
+def enabled() -> bool:
+    return INVALIDATION_BUS and database.engine.dialect.name == "postgresql"
+
+
+# ---------- publication ----------
+
+def publish(db: Session, entity: str, id: Optional[int] = None, categorie_id: Optional[int] = None):
+    """Événement envoyé aux autres workers (et aux observateurs locaux) au commit de la transaction de db"""
+    session = getattr(db, "sync_session", db)  # AsyncSession : session sync sous-jacente
+    session.info.setdefault(_PENDING, set()).add((entity, id, categorie_id))
+
+
+class _Sequence:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def take(self, count: int) -> int:
+        """Réserve count numéros consécutifs ; retourne le premier"""
+        with self._lock:
+            self.value += count
+            return self.value - count + 1
+
+    def release(self, first: int, count: int):
+        """Rend des numéros dont les notifications n'ont pas été commitées, s'ils sont encore les derniers pris"""
+        with self._lock:
+            if self.value == first + count - 1:
+                self.value = first - 1
+
+
+_sequence = _Sequence()
+
+
+class _Clock:
+    """Horodatage des commits : nanosecondes, strictement croissant, jamais derrière un horodatage reçu"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last = time.time_ns()
+
+    def next(self) -> int:
+        with self._lock:
+            self.last = max(self.last + 1, time.time_ns())
+            return self.last
+
+    def observe(self, stamp: int):
+        with self._lock:
+            self.last = max(self.last, stamp)
+
+
+_clock = _Clock()
+
+
+def stamp() -> int:
+    return _clock.next()
+
+
+def _chunks(events: list) -> list[list]:
+    """Découpe les événements en charges NOTIFY sous la limite"""
+    chunks, current, size = [], [], 0
+    for e in events:
+        length = len(json.dumps(e, separators=(",", ":"))) + 1
+        if current and size + length > PAYLOAD_LIMIT - 100:  # marge pour l'enveloppe
+            chunks.append(current)
+            current, size = [], 0
+        current.append(e)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _sorted(events) -> list[tuple]:
+    return sorted(events, key=lambda e: (e[0], e[2] or 0, e[1] or 0))
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session):
+    if not INVALIDATION_BUS or session.get_bind().dialect.name != "postgresql":
+        return
+    # flush d'abord : les écouteurs d'ORM publient pendant le flush
+    session.flush()
+    events = _sorted(session.info.get(_PENDING, ()))
+    if not events:
+        return
+    session.info[_STAMP] = stamp()
+    chunks = _chunks(events)
+    first = _sequence.take(len(chunks))  # un numéro de séquence par charge
+    session.info[_SEQUENCE] = (first, len(chunks))
+    for i, chunk in enumerate(chunks):
+        payload = json.dumps({"o": ORIGIN, "s": first + i, "t": session.info[_STAMP], "e": chunk},
+                             separators=(",", ":"))
+        session.execute(sql_select(func.pg_notify(INVALIDATION_CHANNEL, payload)))
+
+
+@event.listens_for(Session, "after_commit")
+def _watch_after_commit(session: Session):
+    events = session.info.pop(_PENDING, None)
+    committed_at = session.info.pop(_STAMP, None)
+    session.info.pop(_SEQUENCE, None)
+    if events:
+        _notify_watchers(_sorted(events), committed_at or stamp())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_STAMP, None)
+    # numéros pris avant un COMMIT en échec : rendus, sinon les autres workers y
+    # verraient une notification perdue (vidage complet). Si un commit concurrent
+    # en a pris d'autres depuis, le trou reste et se résout ainsi.
+    reserved = session.info.pop(_SEQUENCE, None)
+    if reserved is not None:
+        _sequence.release(*reserved)
+
+
+def _notify_watchers(events: list[tuple], committed_at: int):
+    for hook in _watchers:
+        try:
+            hook(events, committed_at)
+        except Exception:
+            # le commit est fait : un observateur en échec ne doit pas faire échouer la requête
+            logger.exception("Observateur d'invalidation en échec")
+
+
+# ---------- application locale ----------
+
+def _with_session(fn):
+    db = database.SessionLocal()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+
+def apply(events: list[tuple], committed_at: Optional[int] = None):
+    """Applique aux caches de ce worker des événements venus d'un autre worker"""
+    by_entity = defaultdict(list)
+    for entity, id, categorie_id in events:
+        by_entity[entity].append((id, categorie_id))
+
+    for id, categorie_id in by_entity.get("categorie", ()):
+        reference_cache.invalidate_categories()
+        reference_cache.invalidate_criteres(categorie_id)
+        singleflight.forget_category(categorie_id)
+    for _, categorie_id in by_entity.get("critere", ()):
+        reference_cache.invalidate_criteres(categorie_id)
+    if by_entity.keys() & {"categorie", "critere", "assignation"}:
+        validation_index.index.invalidate()
+    for _, categorie_id in by_entity.get("assignation", ()):
+        singleflight.forget_category(categorie_id)
+
+    candidat_ids = sorted({id for id, _ in by_entity.get("candidat", ()) if id is not None})
+    if candidat_ids:
+        removed = _with_session(lambda db: candidate_search.index.refresh(db, candidat_ids))
+        for candidat_id in removed:
+            validation_index.index.forget_candidat(candidat_id)
+        if removed:
+            singleflight.clear()  # noms et classements des candidats supprimés
+
+    scores = defaultdict(set)
+    for id, categorie_id in by_entity.get("score", ()):
+        scores[categorie_id].add(id)
+    for categorie_id, ids in scores.items():
+        changed = None if None in ids else sorted(ids)
+        if leaderboard.broker.has_subscribers(categorie_id):
+            _with_session(lambda db: leaderboard.publish_change(db, categorie_id, changed))
+        else:
+            singleflight.forget_category(categorie_id)
+
+    for entity, items in by_entity.items():
+        for handler in _subscribers.get(entity, ()):
+            handler([(entity, id, categorie_id) for id, categorie_id in items])
+
+    if committed_at is None:
+        committed_at = stamp()
+    else:
+        _clock.observe(committed_at)
+    _notify_watchers(events, committed_at)
+
+
+def flush_all(reason: str, level: int = logging.WARNING, initial: bool = False):
+    """Trou dans le flux d'événements : plus rien de local n'est sûr, on vide tout"""
+    logger.log(level, "Vidage complet des caches locaux (%s)", reason)
+    cache.clear_all()
+    validation_index.index.invalidate()
+    candidate_search.index.invalidate()
+    singleflight.clear()
+    leaderboard.broker.resync_all()
+    for hook in _flush_hooks:
+        hook(initial)
+
+
+# ---------- écoute ----------
+
+def _notifications(raw, timeout: float):
+    """Charges reçues sur la connexion DBAPI pendant au plus timeout secondes (psycopg 3 ou psycopg2)"""
+    if hasattr(raw, "poll"):  # psycopg2
+        if select.select([raw], [], [], timeout)[0]:
+            raw.poll()
+        while raw.notifies:
+            yield raw.notifies.pop(0).payload
+    else:
+        for notify in raw.notifies(timeout=timeout):
+            yield notify.payload
+
+
+class Listener:
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._engine = None
+        self.connected = False
+        self.received = 0
+        self.applied = 0
+        self.own = 0
+        self.reconnects = 0
+        self.gaps = 0
+        self.errors = 0
+        self._expected: dict[str, int] = {}          # origine -> prochain numéro attendu
+        self._missing: dict[tuple[str, int], float] = {}  # (origine, numéro) -> vu manquant à
+
+    def start(self):
+        if self._thread is None and enabled():
+            self._engine = create_engine(database.DATABASE_URL, poolclass=NullPool,
+                                         isolation_level="AUTOCOMMIT")
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="invalidation-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    def _run(self):
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                with self._engine.connect() as conn:
+                    conn.exec_driver_sql(f"LISTEN {INVALIDATION_CHANNEL}")
+                    self.connected = True
+                    backoff = 0.5
+                    # ce qui a été publié avant ce LISTEN n'a pas été vu
+                    if self.reconnects:
+                        flush_all("reconnexion")
+                    else:
+                        flush_all("démarrage de l'écoute", logging.INFO, initial=True)
+                    self._listen(conn)
+            except Exception:
+                if self._stop.is_set():
+                    break
+                logger.exception("Connexion LISTEN perdue, nouvelle tentative dans %.1f s", backoff)
+                self.reconnects += 1
+            finally:
+                self.connected = False
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, INVALIDATION_RECONNECT_MAX)
+
+    def _listen(self, conn):
+        raw = conn.connection.dbapi_connection
+        last_check = time.monotonic()
+        while not self._stop.is_set():
+            for payload in _notifications(raw, 1.0):
+                self._handle(payload)
+            self._check_gaps()
+            if time.monotonic() - last_check > INVALIDATION_HEARTBEAT:
+                conn.exec_driver_sql("SELECT 1")  # détecte une connexion morte sans erreur réseau
+                last_check = time.monotonic()
+
+    def _handle(self, payload: str):
+        self.received += 1
+        try:
+            message = json.loads(payload)
+            origin, seq = message["o"], message["s"]
+            if origin == ORIGIN:
+                self.own += 1
+                return
+            self._track(origin, seq)
+            apply([tuple(e) for e in message["e"]], message.get("t"))
+            self.applied += 1
+        except Exception:
+            # état local incertain : autant repartir de zéro
+            self.errors += 1
+            logger.exception("Événement d'invalidation non applicable : %.200s", payload)
+            flush_all("événement non applicable")
+
+    def _track(self, origin: str, seq: int):
+        expected = self._expected.get(origin)
+        if expected is None or seq >= expected:
+            if expected is not None:
+                # commits concurrents d'un même worker : l'ordre d'arrivée peut différer
+                now = time.monotonic()
+                for missing in range(expected, seq):
+                    self._missing[(origin, missing)] = now
+            self._expected[origin] = seq + 1
+        else:
+            self._missing.pop((origin, seq), None)
+
+    def _check_gaps(self):
+        if not self._missing:
+            return
+        limit = time.monotonic() - INVALIDATION_GAP_GRACE
+        if any(seen < limit for seen in self._missing.values()):
+            lost = len(self._missing)
+            self._missing.clear()
+            self.gaps += 1
+            flush_all(f"{lost} notification(s) manquante(s)")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": enabled(),
+            "channel": INVALIDATION_CHANNEL,
+            "origin": ORIGIN,
+            "connected": self.connected,
+            "received": self.received,
+            "own": self.own,
+            "applied": self.applied,
+            "reconnects": self.reconnects,
+            "gaps": self.gaps,
+            "errors": self.errors,
+            "pending_gaps": len(self._missing),
+        }
+
+
+listener = Listener()
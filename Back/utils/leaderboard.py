@@ -0,0 +1,161 @@
+# backend/utils/leaderboard.py
+"""
+Diffusion en direct des scores finaux (Server-Sent Events).
+
+Chaque abonné reçoit d'abord un instantané de la catégorie, puis uniquement les
+lignes final_scores modifiées. Une écriture de note calcule ces lignes une seule
+fois (et seulement s'il y a des abonnés à la catégorie) puis les distribue à
+toutes les files des abonnés.
+"""
+import asyncio
+import json
+import os
+import threading
+from typing import Optional
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from .. import models, database
+from . import singleflight
+
+HEARTBEAT_SECONDS = float(os.getenv("LEADERBOARD_HEARTBEAT", "15"))
+QUEUE_SIZE = int(os.getenv("LEADERBOARD_QUEUE_SIZE", "256"))
+
+# Marqueur déposé quand un abonné trop lent a perdu des messages : il repart d'un instantané
+RESYNC = object()
+
+
+def final_score_rows(db: Session, categorie_id: int, candidat_ids: Optional[list[int]] = None) -> list[dict]:
+    """Lignes du classement final (toute la catégorie ou quelques candidats)"""
+    query = (
+        db.query(models.FinalScore.candidat_id, models.FinalScore.note_finale, models.FinalScore.nb_jury,
+                 models.Candidat.nom, models.Candidat.prenom, models.Candidat.email, models.Candidat.projet)
+        .join(models.Candidat, models.FinalScore.candidat_id == models.Candidat.id)
+        .filter(models.FinalScore.categorie_id == categorie_id)
+    )
+    if candidat_ids is not None:
+        query = query.filter(models.FinalScore.candidat_id.in_(candidat_ids))
+
+    return [
+        {
+            "candidat_id": r.candidat_id,
+            "nom_candidat": r.nom,
+            "prenom_candidat": r.prenom or "",
+            "email": r.email or "",
+            "projet": r.projet or "",
+            "note_finale": float(r.note_finale),
+            "nb_jury": r.nb_jury,
+        }
+        for r in query
+    ]
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, message):
+        # exécuté dans la boucle de l'abonné
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[_Subscriber]] = {}
+
+    def subscribe(self, categorie_id: int) -> _Subscriber:
+        sub = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(categorie_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, categorie_id: int, sub: _Subscriber):
+        with self._lock:
+            subs = self._subscribers.get(categorie_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[categorie_id]
+
+    def has_subscribers(self, categorie_id: int) -> bool:
+        return bool(self._subscribers.get(categorie_id))
+
+    def broadcast(self, categorie_id: int, message):
+        with self._lock:
+            subs = list(self._subscribers.get(categorie_id, ()))
+        for sub in subs:
+            sub.loop.call_soon_threadsafe(sub.deliver, message)
+
+    def resync_all(self):
+        """Chaque abonné repart d'un instantané (événements éventuellement perdus)"""
+        with self._lock:
+            categories = list(self._subscribers)
+        for categorie_id in categories:
+            self.broadcast(categorie_id, RESYNC)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {str(cat): len(subs) for cat, subs in self._subscribers.items()}
+
+
+broker = Broker()
+
+
+def publish_change(db: Session, categorie_id: int, candidat_ids: Optional[list[int]] = None):
+    """
+    À appeler après le commit d'une écriture de notes. candidat_ids=None signale
+    un recalcul complet de la catégorie (les abonnés reçoivent un nouvel instantané).
+    """
+    singleflight.forget_category(categorie_id)
+    if not broker.has_subscribers(categorie_id):
+        return
+    if candidat_ids is None:
+        broker.broadcast(categorie_id, RESYNC)
+        return
+
+    rows = final_score_rows(db, categorie_id, candidat_ids)
+    presents = {r["candidat_id"] for r in rows}
+    broker.broadcast(categorie_id, {
+        "categorie_id": categorie_id,
+        "lignes": rows,
+        "supprimes": [c for c in candidat_ids if c not in presents],
+    })
+
+
+def _snapshot(categorie_id: int) -> list[dict]:
+    db = database.SessionLocal()
+    try:
+        return final_score_rows(db, categorie_id)
+    finally:
+        db.close()
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def sse_stream(categorie_id: int, request: Request):
+    """Générateur SSE : instantané, puis mises à jour, avec battement de cœur"""
+    # abonnement avant l'instantané : aucune modification ne peut passer entre les deux
+    sub = broker.subscribe(categorie_id)
+    try:
+        yield _event("snapshot", await run_in_threadpool(_snapshot, categorie_id))
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if message is RESYNC:
+                yield _event("snapshot", await run_in_threadpool(_snapshot, categorie_id))
+            else:
+                yield _event("update", message)
+    finally:
+        broker.unsubscribe(categorie_id, sub)
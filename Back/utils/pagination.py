@@ -0,0 +1,93 @@
+# backend/utils/pagination.py
+"""
+Pagination par curseur (keyset sur id) et projection de colonnes pour les endpoints de liste.
+
+- ?limit=N&after=<id> : lignes d'id > after, triées par id ; l'en-tête X-Next-Cursor
+  donne la valeur de `after` pour la page suivante.
+- ?fields=nom,email : ne sélectionne que ces colonnes (id toujours inclus).
+- ?count=exact|estimate : en-tête X-Total-Count (estimate lit pg_class sur Postgres).
+
+En RESPONSE_MODE=fast, même sans ?fields la requête ne lit que les colonnes du
+schéma de sortie (tuples, pas d'entités ORM) et la page est encodée par orjson.
+"""
+from typing import Optional
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from . import serialization
+
+MAX_LIMIT = 1000
+PAGE_HEADERS = ["X-Total-Count", "X-Next-Cursor", "X-Next-Offset"]
+
+
+def parse_fields(fields: Optional[str], model, allowed: list[str]):
+    """Transforme ?fields=a,b en liste de colonnes, id en tête ; None si pas de projection"""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus : {', '.join(unknown)}")
+    names = ["id"] + [n for n in names if n != "id"]
+    return [getattr(model, n) for n in names]
+
+
+def keyset(query, id_column, limit: Optional[int], after: Optional[int]):
+    """Applique after/limit triés par id (le curseur reste stable malgré les insertions)"""
+    if after is not None:
+        query = query.filter(id_column > after)
+    query = query.order_by(id_column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def total_count(db: Session, model, mode: Optional[str]) -> Optional[int]:
+    """Compte exact (parcours de l'index PK) ou estimation du planificateur Postgres"""
+    if mode is None:
+        return None
+    if mode == "estimate" and db.get_bind().dialect.name == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+            {"t": model.__tablename__},
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return db.query(func.count(model.id)).scalar()
+
+
+def page_headers(items_ids: list[int], limit: Optional[int], total: Optional[int]) -> dict:
+    headers = {}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    if limit is not None and len(items_ids) == limit:
+        headers["X-Next-Cursor"] = str(items_ids[-1])
+    return headers
+
+
+def respond(rows, columns, response: Response, headers: dict):
+    """
+    Sans projection : renvoie les entités (validées par response_model).
+    Avec projection : renvoie directement les colonnes demandées.
+    """
+    if columns is None:
+        response.headers.update(headers)
+        return rows
+    content = serialization.as_dicts(rows, columns)
+    if serialization.fast():
+        return serialization.FastJSONResponse(content, headers=headers)
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
+
+
+def list_page(db: Session, model, out_schema, response: Response,
+              limit: Optional[int], after: Optional[int], fields: Optional[str], count: Optional[str]):
+    """Endpoint de liste complet : projection, keyset, en-têtes de pagination"""
+    columns = parse_fields(fields, model, list(out_schema.model_fields))
+    if columns is None and serialization.fast():
+        columns = serialization.schema_columns(model, out_schema)
+    query = db.query(*columns) if columns else db.query(model)
+    rows = keyset(query, model.id, limit, after).all()
+    headers = page_headers([r.id for r in rows], limit, total_count(db, model, count))
+    return respond(rows, columns, response, headers)
@@ -0,0 +1,81 @@
+# backend/utils/pool_metrics.py
+"""
+Compteurs du pool de connexions SQLAlchemy, alimentés par les événements du pool
+(connect / checkout / checkin / invalidate) et par une sous-classe de QueuePool
+qui chronomètre l'attente d'une connexion libre.
+"""
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _incr(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def observe_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def instrument(self, engine):
+        """Branche les compteurs sur les événements du pool de l'engine"""
+        event.listen(engine, "connect", lambda *a: self._incr("connects"))
+        event.listen(engine, "checkout", lambda *a: self._incr("checkouts"))
+        event.listen(engine, "checkin", lambda *a: self._incr("checkins"))
+        event.listen(engine, "invalidate", lambda *a: self._incr("invalidations"))
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "waits": self.waits,
+                "wait_avg_ms": round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        # état instantané (absent des pools SQLite sans file d'attente)
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, attr):
+                data[attr] = getattr(pool, attr)()
+        data["status"] = pool.status()
+        return data
+
+
+class _TimedGetMixin:
+    """Mesure le temps passé à obtenir une connexion (file d'attente comprise)"""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics._incr("timeouts")
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - start)
+
+
+def timed_pool_class(metrics: PoolMetrics, asynchronous: bool = False):
+    """Classe de pool liée à `metrics` (conservée par pool.recreate() après un dispose)"""
+    base = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    return type(f"Timed{base.__name__}", (_TimedGetMixin, base), {"metrics": metrics})
@@ -0,0 +1,302 @@
+# backend/utils/profiling.py
+"""
+Profilage des requêtes HTTP (par worker) :
+
+- histogramme de latence par route (modèle de chemin, pas l'URL brute) ;
+- nombre d'instructions SQL et temps passé en base par requête, mesurés avec
+  les événements before/after_cursor_execute de l'engine ;
+- journalisation des requêtes qui dépassent PROFILE_QUERY_BUDGET instructions
+  ou PROFILE_LATENCY_BUDGET_MS millisecondes ;
+- export au format texte Prometheus (GET /metrics) ;
+- optionnel (PROFILE_SAMPLING=true) : un thread échantillonne les piles d'appels
+  des requêtes en cours et conserve celles des PROFILE_SLOW_KEEP plus lentes,
+  au format « folded » (flamegraph.pl, speedscope).
+
+Les compteurs sont propres au processus ; avec plusieurs workers uvicorn,
+Prometheus agrège les cibles.
+"""
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger("evaluation.profiling")
+
+PROFILE_QUERY_BUDGET = int(os.getenv("PROFILE_QUERY_BUDGET", "20"))
+PROFILE_LATENCY_BUDGET_MS = float(os.getenv("PROFILE_LATENCY_BUDGET_MS", "500"))
+PROFILE_SAMPLING = os.getenv("PROFILE_SAMPLING", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_SLOW_KEEP = int(os.getenv("PROFILE_SLOW_KEEP", "20"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Label commun aux chemins sans route (404) : l'URL brute ferait exploser la cardinalité
+UNMATCHED = "unmatched"
+
+
+class RequestStats:
+    """Mesures d'une requête ; partagé avec les threads du threadpool via le ContextVar"""
+    __slots__ = ("queries", "db_seconds", "threads", "samples")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.threads = {threading.get_ident()}
+        self.samples: Optional[Counter] = Counter() if PROFILE_SAMPLING else None
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        out, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.total}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum}")
+        out.append(f"{name}_count{{{labels}}} {self.total}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))  # (method, route)
+        self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))  # (method, route)
+        self.db_seconds = defaultdict(float)  # (method, route)
+        self.responses = Counter()  # (method, route, status)
+        self.over_budget = Counter()  # (method, route)
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats, slow: bool):
+        key = (method, route)
+        with self._lock:
+            self.latency[key].observe(seconds)
+            self.queries[key].observe(stats.queries)
+            self.db_seconds[key] += stats.db_seconds
+            self.responses[(method, route, status)] += 1
+            if slow:
+                self.over_budget[key] += 1
+
+    def render(self) -> str:
+        def labels(method, route):
+            return f'method="{method}",route="{route}"'
+
+        lines = [
+            "# HELP http_request_duration_seconds Durée des requêtes HTTP par route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (method, route), hist in sorted(self.latency.items()):
+                lines += hist.lines("http_request_duration_seconds", labels(method, route))
+            lines += ["# HELP http_requests_total Requêtes HTTP par route et code de réponse",
+                      "# TYPE http_requests_total counter"]
+            for (method, route, status), n in sorted(self.responses.items()):
+                lines.append(f'http_requests_total{{{labels(method, route)},status="{status}"}} {n}')
+            lines += ["# HELP db_statements_per_request Instructions SQL émises par requête HTTP",
+                      "# TYPE db_statements_per_request histogram"]
+            for (method, route), hist in sorted(self.queries.items()):
+                lines += hist.lines("db_statements_per_request", labels(method, route))
+            lines += ["# HELP db_time_seconds_total Temps passé en base par route",
+                      "# TYPE db_time_seconds_total counter"]
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                lines.append(f"db_time_seconds_total{{{labels(method, route)}}} {seconds}")
+            lines += ["# HELP http_requests_over_budget_total Requêtes au-delà du budget de latence ou de requêtes SQL",
+                      "# TYPE http_requests_over_budget_total counter"]
+            for (method, route), n in sorted(self.over_budget.items()):
+                lines.append(f"http_requests_over_budget_total{{{labels(method, route)}}} {n}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# ---------- instrumentation SQLAlchemy ----------
+
+def instrument(engine):
+    """Compte les instructions et le temps SQL de la requête HTTP courante"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+            stats.threads.add(threading.get_ident())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = conn.info.get("profiling_started")
+        if stats is not None and started:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - started.pop()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        started = exception_context.connection.info.get("profiling_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+
+# ---------- échantillonnage des piles ----------
+
+class Sampler:
+    """
+    Thread qui, toutes les PROFILE_SAMPLE_INTERVAL_MS, relève la pile des threads
+    associés à chaque requête active (boucle d'événements + threads qui ont émis
+    du SQL pour elle). Le thread de la boucle étant partagé, les requêtes async
+    concurrentes peuvent se voir attribuer les piles des autres : suffisant pour
+    repérer les points chauds d'une requête lente, pas pour un profil exact.
+    """
+
+    def __init__(self, interval: float, keep: int):
+        self.interval = interval
+        self.keep = keep
+        self.active: dict[int, RequestStats] = {}
+        self.slowest: list = []  # tas (durée, n°, description, piles)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="profiling-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def begin(self, stats: RequestStats):
+        with self._lock:
+            self.active[id(stats)] = stats
+
+    def end(self, stats: RequestStats, seconds: float, description: str):
+        with self._lock:
+            self.active.pop(id(stats), None)
+            if not stats.samples:
+                return
+            self._seq += 1
+            entry = (seconds, self._seq, description, dict(stats.samples))
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def _loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                active = list(self.active.values())
+            for stats in active:
+                for thread_id in list(stats.threads):
+                    frame = frames.get(thread_id)
+                    if frame is None or thread_id == me:
+                        continue
+                    stats.samples[_fold(frame)] += 1
+
+    def dump(self) -> str:
+        """Piles des requêtes les plus lentes, au format folded (« pile nb »)"""
+        with self._lock:
+            entries = sorted(self.slowest, reverse=True)
+        out = []
+        for seconds, _, description, samples in entries:
+            out.append(f"# {description} {seconds * 1000:.1f} ms")
+            for stack, n in sorted(samples.items(), key=lambda kv: -kv[1]):
+                out.append(f"{stack} {n}")
+        return "\n".join(out) + "\n"
+
+
+def _fold(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+sampler = Sampler(PROFILE_SAMPLE_INTERVAL_MS / 1000, PROFILE_SLOW_KEEP) if PROFILE_SAMPLING else None
+
+
+# ---------- middleware ASGI ----------
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI pur (pas BaseHTTPMiddleware) : le ContextVar est ainsi vu
+    par l'endpoint, y compris dans le threadpool, et les réponses en flux
+    (SSE, export) ne sont pas mises en tampon.
+    """
+
+    def __init__(self, app, excluded_paths=("/metrics",)):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                streaming = any(k == b"content-type" and v.startswith(b"text/event-stream")
+                                for k, v in message.get("headers", []))
+            await send(message)
+
+        if sampler is not None:
+            sampler.begin(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED
+            method = scope["method"]
+            # un flux SSE dure par construction : seul son budget SQL compte
+            slow = stats.queries > PROFILE_QUERY_BUDGET or (
+                not streaming and seconds * 1000 > PROFILE_LATENCY_BUDGET_MS
+            )
+            registry.record(method, path, status_code, seconds, stats, slow)
+            if slow:
+                logger.warning(
+                    "Budget dépassé : %s %s -> %s en %.1f ms, %d requêtes SQL (%.1f ms en base)",
+                    method, scope["path"], status_code, seconds * 1000, stats.queries, stats.db_seconds * 1000,
+                )
+            if sampler is not None:
+                sampler.end(stats, seconds, f"{method} {scope['path']} {status_code} ({stats.queries} SQL)")
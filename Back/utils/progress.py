@@ -0,0 +1,54 @@
+# backend/utils/progress.py
+"""
+Avancement de la notation d'une catégorie : matrice jurys × candidats du nombre
+de critères notés, à comparer à nb_criteres.
+
+Une seule requête groupée parcourt les notes de la catégorie (jointes aux tables
+d'assignation, pour ignorer les notes d'un jury ou d'un candidat retiré) ; les
+listes de jurys et de candidats ne lisent que les tables de liens. La matrice est
+encodée en tableaux d'entiers (une ligne par jury, colonnes dans l'ordre de
+`candidats`) : 500 × 2000 cellules tiennent en quelques Mo de JSON.
+"""
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from .. import models
+
+
+def completion_matrix(db: Session, categorie_id: int) -> dict:
+    cs, cj, cc = models.CriteriaScore, models.CategoryJury, models.CandidateCategory
+
+    jurys = np.array(db.scalars(
+        select(cj.jury_id).where(cj.categorie_id == categorie_id).order_by(cj.jury_id)
+    ).all(), dtype=np.int64)
+    candidats = np.array(db.scalars(
+        select(cc.candidat_id).where(cc.categorie_id == categorie_id).order_by(cc.candidat_id)
+    ).all(), dtype=np.int64)
+    nb_criteres = db.scalar(
+        select(func.count(models.Critere.id)).where(models.Critere.categorie_id == categorie_id)
+    )
+
+    counts = np.zeros((len(jurys), len(candidats)), dtype=np.int64)
+    rows = db.execute(
+        select(cs.jury_id, cs.candidat_id, func.count(cs.id))
+        .join(cj, (cj.jury_id == cs.jury_id) & (cj.categorie_id == cs.categorie_id))
+        .join(cc, (cc.candidat_id == cs.candidat_id) & (cc.categorie_id == cs.categorie_id))
+        .where(cs.categorie_id == categorie_id)
+        .group_by(cs.jury_id, cs.candidat_id)
+    ).all()
+    if rows:
+        data = np.array(rows, dtype=np.int64)
+        counts[np.searchsorted(jurys, data[:, 0]), np.searchsorted(candidats, data[:, 1])] = data[:, 2]
+
+    complete = counts >= nb_criteres if nb_criteres else np.zeros_like(counts, dtype=bool)
+    return {
+        "categorie_id": categorie_id,
+        "nb_criteres": nb_criteres,
+        "jurys": jurys.tolist(),
+        "candidats": candidats.tolist(),
+        "notes": counts.tolist(),
+        "termines_par_jury": complete.sum(axis=1).tolist(),
+        "termines_par_candidat": complete.sum(axis=0).tolist(),
+        "nb_termines": int(complete.sum()),
+        "nb_attendus": int(counts.size),
+    }
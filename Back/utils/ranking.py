@@ -0,0 +1,153 @@
+# backend/utils/ranking.py
+"""
+Moteur de classement vectorisé : la matrice des notes d'une catégorie est chargée
+en une requête dans un tableau NumPy (candidats × jurys × critères), puis tout le
+calcul (normalisation, correction z-score, moyenne tronquée, rangs, concordance)
+est fait sans boucle Python par ligne.
+"""
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .. import models
+
+# Arrondi appliqué avant de comparer deux scores (évite les fausses égalités flottantes)
+TIE_DECIMALS = 9
+
+
+def load_matrix(db: Session, categorie_id: int):
+    """Charge les notes d'une catégorie : (ids candidats, ids jurys, ids critères, tenseur normalisé)"""
+    cs = models.CriteriaScore
+    rows = db.execute(
+        select(cs.candidat_id, cs.jury_id, cs.critere_id, cs.note, models.Critere.valeur_max)
+        .join(models.Critere, models.Critere.id == cs.critere_id)
+        .where(cs.categorie_id == categorie_id)
+    ).all()
+
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty((0, 0, 0))
+
+    data = np.array(rows, dtype=np.float64)
+    candidats, ci = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+    jurys, ji = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+    criteres, ki = np.unique(data[:, 2].astype(np.int64), return_inverse=True)
+
+    valeur_max = data[:, 4]
+    normalized = np.divide(data[:, 3], valeur_max, out=np.full(len(data), np.nan), where=valeur_max > 0)
+
+    tensor = np.full((len(candidats), len(jurys), len(criteres)), np.nan)
+    tensor[ci, ji, ki] = normalized
+    return candidats, jurys, criteres, tensor
+
+
+def _nanmean(values: np.ndarray, axis):
+    """Moyenne en ignorant les NaN, sans avertissement sur les tranches vides"""
+    present = ~np.isnan(values)
+    count = present.sum(axis=axis)
+    total = np.where(present, values, 0.0).sum(axis=axis)
+    return np.divide(total, count, out=np.full(np.shape(total), np.nan), where=count > 0)
+
+
+def zscore_by_jury(tensor: np.ndarray) -> np.ndarray:
+    """Corrige la sévérité de chaque jury, puis ramène sur l'échelle globale"""
+    mu = _nanmean(tensor, axis=(0, 2))[None, :, None]
+    sd = np.sqrt(_nanmean((tensor - mu) ** 2, axis=(0, 2)))[None, :, None]
+    global_mu = np.nanmean(tensor)
+    global_sd = np.nanstd(tensor)
+
+    z = np.divide(tensor - mu, sd, out=np.zeros_like(tensor), where=sd > 0)
+    return np.where(np.isnan(tensor), np.nan, z * global_sd + global_mu)
+
+
+def trimmed_mean(scores: np.ndarray, trim: float):
+    """Moyenne tronquée par ligne (NaN ignorés) : retire trim × n valeurs à chaque extrémité"""
+    n = (~np.isnan(scores)).sum(axis=1)
+    ordered = np.sort(scores, axis=1)  # les NaN sont rejetés en fin de ligne
+    k = np.floor(n * trim).astype(np.int64)
+    idx = np.arange(scores.shape[1])[None, :]
+    keep = (idx >= k[:, None]) & (idx < (n - k)[:, None])
+    kept = keep.sum(axis=1)
+    total = np.where(keep, ordered, 0.0).sum(axis=1)
+    return np.divide(total, kept, out=np.full(len(scores), np.nan), where=kept > 0), n
+
+
+def average_ranks(values: np.ndarray):
+    """
+    Rangs croissants par colonne avec moyenne des ex æquo.
+    Retourne aussi, par colonne, la correction d'égalités Σ(t³ - t).
+    """
+    n = values.shape[0]
+    order = np.argsort(values, axis=0, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=0)
+    pos = np.broadcast_to(np.arange(1, n + 1)[:, None], values.shape)
+
+    starts = np.ones(values.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+
+    first = np.maximum.accumulate(np.where(starts, pos, 0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, pos, n + 1)[::-1], axis=0)[::-1]
+
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2.0, axis=0)
+    # chaque élément d'un groupe de taille t contribue (t² - 1), soit Σ(t³ - t) par groupe
+    ties = ((last - first + 1) ** 2 - 1).sum(axis=0)
+    return ranks, ties
+
+
+def kendall_w(jury_scores: np.ndarray):
+    """Coefficient de concordance de Kendall sur les jurys ayant noté tous les candidats"""
+    complete = jury_scores[:, ~np.isnan(jury_scores).any(axis=0)]
+    n, m = complete.shape
+    if n < 2 or m < 2:
+        return None, m
+
+    ranks, ties = average_ranks(complete)
+    totals = ranks.sum(axis=1)
+    s = ((totals - totals.mean()) ** 2).sum()
+    denominator = m ** 2 * (n ** 3 - n) - m * ties.sum()
+    if denominator <= 0:
+        return None, m
+    return float(12.0 * s / denominator), m
+
+
+def rank(scores: np.ndarray, nb_jury: np.ndarray, candidat_ids: np.ndarray):
+    """
+    Rangs décroissants : dense, fractionnaire (moyenne des ex æquo) et ordinal.
+    L'ordinal départage les ex æquo par nombre de jurys puis par id candidat.
+    """
+    rounded = np.round(scores, TIE_DECIMALS)
+    order = np.lexsort((candidat_ids, -nb_jury, -rounded))
+
+    _, inverse, counts = np.unique(-rounded, return_inverse=True, return_counts=True)
+    starts = np.cumsum(counts) - counts
+    dense = inverse + 1
+    fractional = starts[inverse] + (counts[inverse] + 1) / 2.0
+
+    ordinal = np.empty(len(scores), dtype=np.int64)
+    ordinal[order] = np.arange(1, len(scores) + 1)
+    return order, dense, fractional, ordinal
+
+
+def compute_ranking(tensor: np.ndarray, candidat_ids: np.ndarray, zscore: bool = False, trim: float = 0.0):
+    """Calcule en une passe vectorisée les scores finaux, les rangs et la concordance"""
+    if zscore:
+        tensor = zscore_by_jury(tensor)
+
+    # score d'un jury pour un candidat = moyenne de ses critères normalisés (0..1)
+    jury_scores = _nanmean(tensor, axis=2)
+    scores, nb_jury = trimmed_mean(jury_scores, trim)
+    order, dense, fractional, ordinal = rank(scores, nb_jury, candidat_ids)
+    w, nb_jurys_w = kendall_w(jury_scores)
+
+    return {
+        "order": order,
+        "scores": scores * 100.0,
+        "nb_jury": nb_jury,
+        "dense": dense,
+        "fractional": fractional,
+        "ordinal": ordinal,
+        "kendall_w": w,
+        "nb_jurys_w": nb_jurys_w,
+    }
@@ -0,0 +1,227 @@
+# backend/utils/read_routing.py
+"""
+Routage des lectures vers des réplicas en lecture seule (REPLICA_DATABASE_URL).
+
+- Sessions : database.get_db reste la session lecture-écriture sur le
+  primaire ; database.get_read_db (GET lourds) prend un réplica, à tour de
+  rôle s'il y en a plusieurs, et le primaire si aucun n'est configuré ou
+  joignable.
+- Santé : un réplica dont la connexion échoue (au contrôle ou pendant une
+  requête) est écarté REPLICA_RETRY secondes ; un réplica sain n'est
+  recontrôlé qu'une fois par REPLICA_RETRY secondes, pas à chaque requête.
+- Lecture de ses propres écritures : un commit sur le primaire pendant une
+  requête HTTP pose le cookie PIN_COOKIE (échéance) pour
+  READ_AFTER_WRITE_WINDOW secondes ; tant qu'il est valide, les lectures de
+  ce client restent sur le primaire, quel que soit le worker qui les sert.
+  Le retard de réplication doit donc rester sous cette fenêtre.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from starlette.requests import cookie_parser
+
+logger = logging.getLogger("evaluation.read_routing")
+
+READ_AFTER_WRITE_WINDOW = float(os.getenv("READ_AFTER_WRITE_WINDOW", "5"))
+REPLICA_RETRY = float(os.getenv("REPLICA_RETRY", "10"))
+
+PIN_COOKIE = "rw_pin"
+PRIMARY = "primary"
+
+
+class _RequestState:
+    """Routage de la requête en cours ; partagé avec le threadpool via le ContextVar"""
+    __slots__ = ("pinned", "wrote")
+
+    def __init__(self, pinned: bool):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_current: ContextVar[Optional[_RequestState]] = ContextVar("read_routing", default=None)
+
+
+def pinned() -> bool:
+    state = _current.get()
+    return state is not None and state.pinned
+
+
+def mark_write():
+    """Commit sur le primaire : le client lira sur le primaire pendant la fenêtre"""
+    state = _current.get()
+    if state is not None:
+        state.wrote = True
+        state.pinned = True  # suite de la même requête (réponses en flux)
+
+
+def source(db) -> str:
+    """Base servant cette session : "primary" ou nom du réplica"""
+    session = getattr(db, "sync_session", db)
+    return session.info.get("source", PRIMARY)
+
+
+class ReadAfterWriteMiddleware:
+    """Middleware ASGI pur : lit le cookie d'épinglage, le pose après une écriture"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookies = {}
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                cookies = cookie_parser(value.decode("latin-1"))
+                break
+        try:
+            pinned_until = float(cookies.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        state = _RequestState(pinned_until > time.time())
+        token = _current.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state.wrote and READ_AFTER_WRITE_WINDOW > 0:
+                window = int(READ_AFTER_WRITE_WINDOW + 0.999)
+                cookie = (f"{PIN_COOKIE}={time.time() + READ_AFTER_WRITE_WINDOW:.3f}; Max-Age={window}; "
+                          "Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+                router_stats.incr("pins")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = defaultdict(int)
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+router_stats = _Counters()
+
+
+class _Replica:
+    def __init__(self, name: str, engine, factory: Callable):
+        self.name = name
+        self.engine = engine
+        self.factory = factory
+        self.down_until = 0.0
+        self.checked_at: Optional[float] = None
+        self.failures = 0
+
+
+class ReadRouter:
+    """Choix de la session de lecture parmi les réplicas (sync ou async selon les fabriques)"""
+
+    def __init__(self, replicas: list[tuple[str, object, Callable]]):
+        self.replicas = [_Replica(*r) for r in replicas]
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        for replica in self.replicas:
+            engine = getattr(replica.engine, "sync_engine", replica.engine)
+            event.listen(engine, "handle_error", self._error_listener(replica))
+
+    def _error_listener(self, replica: _Replica):
+        def _on_error(context):
+            # connexion impossible ou coupée : pas une simple erreur SQL
+            if context.is_disconnect or context.connection is None:
+                self._mark_down(replica, context.original_exception)
+        return _on_error
+
+    def _mark_down(self, replica: _Replica, error: BaseException):
+        with self._lock:
+            if replica.down_until > time.monotonic():
+                return  # même panne, déjà signalée (contrôle et handle_error)
+            replica.down_until = time.monotonic() + REPLICA_RETRY
+            replica.checked_at = None
+            replica.failures += 1
+        logger.warning("Réplica %s écarté %.0f s : %s", replica.name, REPLICA_RETRY, error)
+
+    def _candidates(self):
+        """Réplicas disponibles, en commençant par celui dont c'est le tour"""
+        if not self.replicas or pinned():
+            return []
+        now = time.monotonic()
+        start = next(self._turn) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [r for r in ordered if r.down_until <= now]
+
+    @staticmethod
+    def _needs_check(replica: _Replica) -> bool:
+        return replica.checked_at is None or time.monotonic() - replica.checked_at > REPLICA_RETRY
+
+    def _routed(self, name: str):
+        router_stats.incr(f"reads_{name}")
+        if name == PRIMARY and self.replicas:
+            router_stats.incr("reads_pinned" if pinned() else "reads_fallback")
+
+    def session(self, primary: Callable):
+        """Session de lecture (Session) ; primary : fabrique de sessions du primaire"""
+        for replica in self._candidates():
+            if self._needs_check(replica):
+                try:
+                    with replica.engine.connect():
+                        pass
+                except DBAPIError as e:
+                    self._mark_down(replica, e)
+                    continue
+                replica.checked_at = time.monotonic()
+            self._routed(replica.name)
+            return replica.factory()
+        self._routed(PRIMARY)
+        return primary()
+
+    async def async_session(self, primary: Callable):
+        """Même chose pour une AsyncSession"""
+        for replica in self._candidates():
+            if self._needs_check(replica):
+                try:
+                    async with replica.engine.connect():
+                        pass
+                except DBAPIError as e:
+                    self._mark_down(replica, e)
+                    continue
+                replica.checked_at = time.monotonic()
+            self._routed(replica.name)
+            return replica.factory()
+        self._routed(PRIMARY)
+        return primary()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "read_after_write_window": READ_AFTER_WRITE_WINDOW,
+            "counts": router_stats.snapshot(),
+            "replicas": [
+                {
+                    "name": r.name,
+                    "url": r.engine.url.render_as_string(hide_password=True),
+                    "available": r.down_until <= now,
+                    "retry_in_seconds": max(0.0, round(r.down_until - now, 1)),
+                    "failures": r.failures,
+                }
+                for r in self.replicas
+            ],
+        }
@@ -0,0 +1,25 @@
+# backend/utils/reference_cache.py
+"""
+Cache de lecture des données de référence (catégories, critères par catégorie).
+Elles ne changent presque jamais pendant une session de notation : les endpoints
+d'écriture invalident explicitement, le TTL borne la dérive en cas d'écriture
+faite hors de l'API.
+"""
+import os
+from .cache import TTLCache
+
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+
+CATEGORIES = TTLCache("categories", maxsize=1, ttl=REFERENCE_CACHE_TTL)
+CRITERES = TTLCache("criteres_by_category", maxsize=int(os.getenv("CRITERES_CACHE_SIZE", "1000")),
+                    ttl=REFERENCE_CACHE_TTL)
+
+ALL = "all"
+
+
+def invalidate_categories():
+    CATEGORIES.clear()
+
+
+def invalidate_criteres(categorie_id: int):
+    CRITERES.pop(categorie_id)
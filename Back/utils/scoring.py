@@ -0,0 +1,57 @@
+# backend/utils/scoring.py
+from sqlalchemy.orm import Session
+from .. import models
+from .dialect import insert_for
+from . import aggregation
+
+# Colonnes de la contrainte uq_candidat_jury_critere
+CONFLICT_COLUMNS = ["candidat_id", "jury_id", "critere_id"]
+
+
+def upsert_criteria_scores(db: Session, candidat_id: int, jury_id: int, categorie_id: int, notes: list[dict],
+                           final: bool = True):
+    """
+    Écrit toutes les notes d'un jury pour un candidat en un seul
+    INSERT ... ON CONFLICT DO UPDATE et met à jour les agrégats. Ne fait pas de commit.
+    Retourne une ligne {id, critere_id, status} par critère.
+    """
+    # Un même critère ne peut être touché deux fois par l'instruction : la dernière valeur l'emporte.
+    # Critères triés : deux transactions verrouillent les lignes dans le même ordre
+    par_critere = dict(sorted({n["critere_id"]: n for n in notes}.items()))
+
+    # seulement pour le statut renvoyé : les agrégats sont recalculés depuis la base
+    existants = {
+        critere_id for (critere_id,) in db.query(models.CriteriaScore.critere_id).filter(
+            models.CriteriaScore.candidat_id == candidat_id,
+            models.CriteriaScore.jury_id == jury_id,
+            models.CriteriaScore.critere_id.in_(par_critere.keys()),
+        )
+    }
+
+    stmt = insert_for(db, models.CriteriaScore).values([
+        {
+            "candidat_id": candidat_id,
+            "jury_id": jury_id,
+            "categorie_id": categorie_id,
+            "critere_id": critere_id,
+            "note": n["note"],
+            "commentaire": n.get("commentaire"),
+        }
+        for critere_id, n in par_critere.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=CONFLICT_COLUMNS,
+        set_={"note": stmt.excluded.note, "commentaire": stmt.excluded.commentaire},
+    ).returning(models.CriteriaScore.id, models.CriteriaScore.critere_id)
+
+    rows = [
+        {
+            "id": row.id,
+            "critere_id": row.critere_id,
+            "status": "updated" if row.critere_id in existants else "created",
+        }
+        for row in db.execute(stmt)
+    ]
+
+    aggregation.refresh_jury_score(db, candidat_id, jury_id, categorie_id, final=final)
+    return rows
@@ -17,6 +17,14 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return PWD_CTX.verify(plain, hashed)
 
+def verify_and_rehash(plain: str, hashed: str):
+    """Vérifie le mot de passe ; renvoie aussi un nouveau hash si PWD_CTX le juge obsolète"""
+    if not PWD_CTX.verify(plain, hashed):
+        return False, None
+    if PWD_CTX.needs_update(hashed):
+        return True, PWD_CTX.hash(plain)
+    return True, None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
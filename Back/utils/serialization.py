@@ -0,0 +1,59 @@
+# backend/utils/serialization.py
+"""
+Mode de réponse des endpoints de lecture (RESPONSE_MODE) :
+
+- "standard" (défaut) : les endpoints renvoient leurs objets Python et FastAPI
+  valide et encode comme avant ;
+- "fast" : les lignes sont lues en tuples de colonnes, transformées en
+  dicts puis encodées directement par orjson ; la réponse étant déjà une
+  Response, FastAPI ne repasse ni par response_model ni par jsonable_encoder.
+  À activer une fois le gain mesuré sur les données réelles :
+  python -m Back.bench serialization --url ...
+"""
+import os
+from decimal import Decimal
+from typing import Optional
+import orjson
+from fastapi.responses import JSONResponse
+
+RESPONSE_MODE = os.getenv("RESPONSE_MODE", "standard")
+
+
+def _default(value):
+    # orjson ne connaît pas Decimal (colonnes Numeric)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encodée par orjson (ORJSONResponse est dépréciée dans les FastAPI récents)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def fast() -> bool:
+    # lu à chaque appel : le banc bascule le mode à chaud
+    return RESPONSE_MODE == "fast"
+
+
+def respond(content, headers: Optional[dict] = None):
+    """Réponse orjson en mode fast ; sinon le contenu tel quel, traité par FastAPI"""
+    if fast():
+        return FastJSONResponse(content, headers=headers)
+    return content
+
+
+def schema_columns(model, schema) -> list:
+    """Colonnes du modèle correspondant aux champs du schéma de sortie, dans l'ordre du schéma"""
+    return [getattr(model, name) for name in schema.model_fields if hasattr(model, name)]
+
+
+def as_dicts(rows, columns) -> list[dict]:
+    names = [c.key for c in columns]
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,228 @@
+# backend/utils/singleflight.py
+"""
+Regroupement (single-flight) des lectures identiques simultanées.
+
+Quand des centaines de clients demandent le même classement dans la même
+seconde, une seule requête SQL part : le premier appel d'une clé l'exécute et
+sérialise le résultat une fois en JSON ; les appels qui arrivent pendant ce
+temps attendent et reçoivent les mêmes octets. Le résultat reste ensuite
+servi pendant SINGLEFLIGHT_TTL_MS (micro-TTL, 0 = seulement les appels
+simultanés).
+
+- Clés : tuples (nom, categorie_id, paramètres...) ; forget() retire les clés
+  d'une catégorie après une écriture (leaderboard.publish_change) : les
+  appels suivants relancent une requête au lieu de rejoindre un résultat
+  antérieur au commit.
+- Erreur : transmise à tous les appels en attente, rien n'est conservé.
+- Par worker ; les routes sync (threads) et async (boucle) ont chacune leur
+  table d'appels en cours, les compteurs sont communs.
+- Désactivé par SINGLEFLIGHT=false : chaque appel exécute sa requête.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Optional
+from fastapi import Response
+from . import serialization
+
+SINGLEFLIGHT = os.getenv("SINGLEFLIGHT", "true").lower() in ("1", "true", "yes")
+SINGLEFLIGHT_TTL_MS = float(os.getenv("SINGLEFLIGHT_TTL_MS", "250"))
+SINGLEFLIGHT_MAX_KEYS = 1024  # au-delà, les résultats expirés sont purgés
+
+
+class _Call:
+    __slots__ = ("done", "body", "error", "finished_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.body: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+
+
+class SingleFlight:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._calls: dict[tuple, _Call] = {}
+        self._async_calls: dict[tuple, asyncio.Future] = {}
+        self._async_done: dict[tuple, tuple[bytes, float]] = {}
+        self.executed = defaultdict(int)   # nom -> requêtes réellement exécutées
+        self.coalesced = defaultdict(int)  # nom -> appels servis par une requête en cours
+        self.reused = defaultdict(int)     # nom -> appels servis dans le micro-TTL
+        self.errors = defaultdict(int)
+
+    def _fresh(self, finished_at: Optional[float]) -> bool:
+        return finished_at is not None and time.monotonic() - finished_at < self.ttl
+
+    @staticmethod
+    def _response(body: bytes) -> Response:
+        return Response(content=body, media_type="application/json")
+
+    # ---------- routes sync (threadpool) ----------
+
+    def do(self, key: tuple, load: Callable[[], object]) -> Response:
+        """Réponse JSON de load(), partagée avec les appels identiques en cours ou récents"""
+        name = key[0]
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None or (call.done.is_set() and not self._fresh(call.finished_at))
+            if leader:
+                if len(self._calls) >= SINGLEFLIGHT_MAX_KEYS:
+                    self._prune()
+                call = self._calls[key] = _Call()
+                self.executed[name] += 1
+            elif call.done.is_set():
+                self.reused[name] += 1
+            else:
+                self.coalesced[name] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self._response(call.body)
+
+        try:
+            call.body = serialization.dumps(load())
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors[name] += 1
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            raise
+        finally:
+            call.finished_at = time.monotonic()
+            call.done.set()
+        if not self.ttl:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+        return self._response(call.body)
+
+    # ---------- routes async ----------
+
+    async def do_async(self, key: tuple, load: Callable[[], Awaitable[object]]) -> Response:
+        """Même chose pour une route async def (attente sans bloquer la boucle)"""
+        name = key[0]
+        with self._lock:  # forget() peut venir d'un autre thread (tampon d'écriture)
+            done = self._async_done.get(key)
+            future = self._async_calls.get(key)
+            if done is not None and self._fresh(done[1]):
+                self.reused[name] += 1
+                return self._response(done[0])
+            leader = future is None
+            if leader:
+                if len(self._async_done) >= SINGLEFLIGHT_MAX_KEYS:
+                    self._prune()
+                future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+                self.executed[name] += 1
+            else:
+                self.coalesced[name] += 1
+        if not leader:
+            return self._response(await asyncio.shield(future))
+
+        try:
+            body = serialization.dumps(await load())
+        except BaseException as e:
+            with self._lock:
+                self.errors[name] += 1
+                if self._async_calls.get(key) is future:
+                    del self._async_calls[key]
+            future.set_exception(e)
+            future.exception()  # marquée comme lue : pas d'avertissement sans attente
+            raise
+        future.set_result(body)
+        with self._lock:
+            if self._async_calls.get(key) is future:  # pas oubliée entre-temps par une écriture
+                del self._async_calls[key]
+                if self.ttl:
+                    self._async_done[key] = (body, time.monotonic())
+        return self._response(body)
+
+    # ---------- invalidation ----------
+
+    def _prune(self):
+        # appelée sous self._lock
+        for key in [k for k, c in self._calls.items() if c.done.is_set() and not self._fresh(c.finished_at)]:
+            del self._calls[key]
+        for key in [k for k, (_, at) in self._async_done.items() if not self._fresh(at)]:
+            del self._async_done[key]
+
+    def forget(self, match: Callable[[tuple], bool]):
+        """
+        Retire les clés pour lesquelles match(clé) est vrai : les appels en cours
+        servent encore leurs attentes, les suivants repartent sur une nouvelle requête.
+        """
+        with self._lock:
+            for table in (self._calls, self._async_calls, self._async_done):
+                for key in [k for k in table if match(k)]:
+                    del table[key]
+
+    def forget_category(self, categorie_id: int):
+        self.forget(lambda key: len(key) > 1 and key[1] == categorie_id)
+
+    def clear(self):
+        self.forget(lambda key: True)
+
+    # ---------- compteurs ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            names = sorted(set(self.executed) | set(self.coalesced) | set(self.reused))
+            return {
+                "enabled": True,
+                "ttl_ms": self.ttl * 1000,
+                "in_flight": sum(not c.done.is_set() for c in self._calls.values()) + len(self._async_calls),
+                "routes": {
+                    name: {
+                        "executed": self.executed.get(name, 0),
+                        "coalesced": self.coalesced.get(name, 0),
+                        "reused": self.reused.get(name, 0),
+                        "errors": self.errors.get(name, 0),
+                    }
+                    for name in names
+                },
+            }
+
+    def render(self) -> str:
+        """Compteurs au format texte Prometheus (ajoutés à /metrics)"""
+        lines = [
+            "# HELP singleflight_calls_total Lectures regroupées : exécutées, rejointes en cours, servies dans le micro-TTL",
+            "# TYPE singleflight_calls_total counter",
+        ]
+        with self._lock:
+            for outcome, counts in (("executed", self.executed), ("coalesced", self.coalesced),
+                                    ("reused", self.reused), ("error", self.errors)):
+                for name, n in sorted(counts.items()):
+                    lines.append(f'singleflight_calls_total{{name="{name}",outcome="{outcome}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+flights = SingleFlight(SINGLEFLIGHT_TTL_MS / 1000) if SINGLEFLIGHT else None
+
+
+def respond(key: tuple, load: Callable[[], object]):
+    """Réponse regroupée si le single-flight est actif, sinon exécution directe"""
+    if flights is None:
+        return serialization.respond(load())
+    return flights.do(key, load)
+
+
+async def respond_async(key: tuple, load: Callable[[], Awaitable[object]]):
+    if flights is None:
+        return serialization.respond(await load())
+    return await flights.do_async(key, load)
+
+
+def forget_category(categorie_id: int):
+    if flights is not None:
+        flights.forget_category(categorie_id)
+
+
+def clear():
+    if flights is not None:
+        flights.clear()
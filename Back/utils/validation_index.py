@@ -0,0 +1,210 @@
+# backend/utils/validation_index.py
+"""Index en mémoire des critères et assignations : valide une écriture de note sans requête"""
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from .. import models
+
+VALIDATION_INDEX_TTL = float(os.getenv("VALIDATION_INDEX_TTL", "60"))
+
+
+class ValidationIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.criteres: dict[int, tuple[int, int]] = {}
+        self.jurys: dict[int, set[int]] = defaultdict(set)
+        self.candidats: dict[int, set[int]] = defaultdict(set)
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self.probes = 0
+        self._generation = 0  # avancée par invalidate()
+        self._loading = 0
+        self._journal: list[Callable[[], None]] = []  # mises à jour faites pendant un chargement, rejouées après
+
+    # ---------- chargement ----------
+
+    def load(self, db: Session):
+        with self._lock:
+            generation = self._generation
+            self._loading += 1
+        try:
+            criteres = {c_id: (cat, vmax) for c_id, cat, vmax in db.query(
+                models.Critere.id, models.Critere.categorie_id, models.Critere.valeur_max)}
+            jurys, candidats = defaultdict(set), defaultdict(set)
+            for jury_id, cat in db.query(models.CategoryJury.jury_id, models.CategoryJury.categorie_id):
+                jurys[cat].add(jury_id)
+            for candidat_id, cat in db.query(models.CandidateCategory.candidat_id,
+                                             models.CandidateCategory.categorie_id):
+                candidats[cat].add(candidat_id)
+            with self._lock:
+                self.criteres, self.jurys, self.candidats = criteres, jurys, candidats
+                # mises à jour faites pendant les requêtes : peut-être absentes de leur résultat
+                for change in self._journal:
+                    change()
+                # invalidé pendant le chargement : la modification a pu être lue trop tôt
+                self.loaded_at = time.monotonic() if generation == self._generation else None
+                self.reloads += 1
+        finally:
+            with self._lock:
+                self._loading -= 1
+                if not self._loading:
+                    self._journal.clear()
+
+    def stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > VALIDATION_INDEX_TTL
+
+    def invalidate(self):
+        """Rechargement complet au prochain usage (modification faite par un autre worker)"""
+        with self._lock:
+            self.loaded_at = None
+            self._generation += 1
+
+    def probe(self, db: Session, categorie_id: int, candidat_id: int, jury_id: int, notes) -> bool:
+        """
+        Relit en base la seule clé qui fait refuser l'écriture et corrige l'index ;
+        True si elle avait changé (l'écriture est alors revérifiée)
+        """
+        with self._lock:
+            jury_known = jury_id in self.jurys.get(categorie_id, ())
+            candidat_known = candidat_id in self.candidats.get(categorie_id, ())
+            criteres = {critere_id: self.criteres.get(critere_id) for critere_id, _ in notes}
+            self.probes += 1
+        if not jury_known:
+            if db.query(models.CategoryJury.jury_id).filter_by(jury_id=jury_id, categorie_id=categorie_id).first():
+                self.add_jury(categorie_id, jury_id)
+                return True
+            return False
+        if not candidat_known:
+            if db.query(models.CandidateCategory.candidat_id).filter_by(
+                    candidat_id=candidat_id, categorie_id=categorie_id).first():
+                self.add_candidats([(categorie_id, candidat_id)])
+                return True
+            return False
+        for critere_id, note in notes:
+            known = criteres[critere_id]
+            if known is not None and known[0] == categorie_id and 0 <= note <= known[1]:
+                continue
+            row = db.query(models.Critere.categorie_id, models.Critere.valeur_max).filter_by(id=critere_id).first()
+            current = None if row is None else (row.categorie_id, row.valeur_max)
+            if current == known:
+                return False
+            if current is None:
+                self.forget_critere(critere_id)
+            else:
+                self.add_critere(critere_id, *current)
+            return True
+        return False
+
+    # ---------- mises à jour incrémentales ----------
+
+    def _change(self, change: Callable[[], None]):
+        with self._lock:
+            change()
+            if self._loading:
+                self._journal.append(change)
+
+    def add_critere(self, critere_id: int, categorie_id: int, valeur_max: int):
+        def change():
+            self.criteres[critere_id] = (categorie_id, valeur_max)
+        self._change(change)
+
+    def forget_critere(self, critere_id: int):
+        self._change(lambda: self.criteres.pop(critere_id, None))
+
+    def add_jury(self, categorie_id: int, jury_id: int):
+        self._change(lambda: self.jurys[categorie_id].add(jury_id))
+
+    def remove_jury(self, categorie_id: int, jury_id: int):
+        self._change(lambda: self.jurys[categorie_id].discard(jury_id))
+
+    def add_candidats(self, links: Iterable[tuple[int, int]]):
+        """links : couples (categorie_id, candidat_id)"""
+        links = list(links)
+
+        def change():
+            for categorie_id, candidat_id in links:
+                self.candidats[categorie_id].add(candidat_id)
+        self._change(change)
+
+    def remove_candidat(self, categorie_id: int, candidat_id: int):
+        self._change(lambda: self.candidats[categorie_id].discard(candidat_id))
+
+    def forget_candidat(self, candidat_id: int):
+        def change():
+            for members in self.candidats.values():
+                members.discard(candidat_id)
+        self._change(change)
+
+    def forget_category(self, categorie_id: int):
+        def change():
+            self.jurys.pop(categorie_id, None)
+            self.candidats.pop(categorie_id, None)
+            self.criteres = {c: v for c, v in self.criteres.items() if v[0] != categorie_id}
+        self._change(change)
+
+    # ---------- validation ----------
+
+    def check(self, categorie_id: int, candidat_id: int, jury_id: int, notes) -> Optional[HTTPException]:
+        """Première erreur trouvée (HTTPException à lever) ou None ; notes : [(critere_id, note)]"""
+        if jury_id not in self.jurys.get(categorie_id, ()):
+            return HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                 detail="Jury non assigné à cette catégorie")
+        if candidat_id not in self.candidats.get(categorie_id, ()):
+            return HTTPException(status_code=400, detail="Candidat non inscrit dans cette catégorie")
+        for critere_id, note in notes:
+            critere = self.criteres.get(critere_id)
+            if critere is None:
+                return HTTPException(status_code=404, detail=f"Critère {critere_id} introuvable")
+            critere_categorie, valeur_max = critere
+            if critere_categorie != categorie_id:
+                return HTTPException(status_code=400,
+                                     detail=f"Le critère {critere_id} n'appartient pas à cette catégorie")
+            if not 0 <= note <= valeur_max:
+                return HTTPException(status_code=400,
+                                     detail=f"Note {note} hors limites pour le critère {critere_id} (0 à {valeur_max})")
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> dict:
+        return {
+            "criteres": len(self.criteres),
+            "categories": len(set(self.jurys) | set(self.candidats)),
+            "assignations_jurys": sum(len(s) for s in self.jurys.values()),
+            "assignations_candidats": sum(len(s) for s in self.candidats.values()),
+            "age_seconds": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1),
+            "reloads": self.reloads,
+            "probes": self.probes,
+        }
+
+
+index = ValidationIndex()
+
+
+def validate(db: Session, categorie_id: int, candidat_id: int, jury_id: int, notes):
+    """Lève l'HTTPException adaptée si l'écriture est invalide (aucune requête si l'index est à jour)"""
+    if index.stale():
+        index.load(db)
+    error = index.check(categorie_id, candidat_id, jury_id, notes)
+    # refus : seule la clé en cause est relue (une assignation toute récente faite ailleurs)
+    while error is not None and index.probe(db, categorie_id, candidat_id, jury_id, notes):
+        error = index.check(categorie_id, candidat_id, jury_id, notes)
+    if error is not None:
+        raise error
+
+
+async def validate_async(db, categorie_id: int, candidat_id: int, jury_id: int, notes):
+    """Même chose pour une AsyncSession (lectures via run_sync)"""
+    if index.stale():
+        await db.run_sync(index.load)
+    error = index.check(categorie_id, candidat_id, jury_id, notes)
+    while error is not None and await db.run_sync(index.probe, categorie_id, candidat_id, jury_id, notes):
+        error = index.check(categorie_id, candidat_id, jury_id, notes)
+    if error is not None:
+        raise error
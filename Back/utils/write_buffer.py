@@ -0,0 +1,211 @@
+# backend/utils/write_buffer.py
+"""Écriture différée (SCORE_WRITE_BEHIND=true) des notes unitaires : tampon en mémoire vidé par lots"""
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Optional
+from sqlalchemy.exc import OperationalError
+from .. import database
+from . import aggregation, scoring, leaderboard
+
+logger = logging.getLogger("evaluation.write_buffer")
+
+SCORE_WRITE_BEHIND = os.getenv("SCORE_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+SCORE_BUFFER_MAX = int(os.getenv("SCORE_BUFFER_MAX", "1000"))
+SCORE_BUFFER_FLUSH_MS = float(os.getenv("SCORE_BUFFER_FLUSH_MS", "500"))
+
+
+class WriteBuffer:
+    def __init__(self, max_entries: int, flush_interval: float):
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # un seul flush à la fois (thread de fond ou lecture)
+        self._pending: dict[tuple, dict] = {}
+        self._inflight: dict[tuple, dict] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.accepted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.dropped = 0
+
+    # ---------- cycle de vie ----------
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="score-write-buffer", daemon=True)
+            self._thread.start()
+
+    def shutdown(self):
+        """Arrête le thread puis écrit les entrées restantes"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flush final impossible : %d notes non écrites", len(self._pending))
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Échec du flush des notes en attente")
+
+    # ---------- écritures ----------
+
+    def put(self, candidat_id: int, jury_id: int, categorie_id: int, critere_id: int,
+            note: float, commentaire: Optional[str]) -> bool:
+        """Dépose une note ; True si elle remplace une valeur encore en attente"""
+        key = (candidat_id, jury_id, critere_id)
+        with self._lock:
+            replaced = key in self._pending
+            self._pending[key] = {"categorie_id": categorie_id, "note": note, "commentaire": commentaire}
+            self.accepted += 1
+            self.coalesced += replaced
+            full = len(self._pending) >= self.max_entries
+        if full:
+            self._wake.set()
+        return replaced
+
+    def discard(self, keys):
+        """
+        Oublie les notes en attente de ces clés (écrasées ou supprimées directement
+        en base). Attend la fin d'un flush en cours : une note déjà partie en
+        écriture est commitée (ou remise en attente) avant d'être oubliée, et ne
+        peut donc plus passer après l'écriture directe qui suit.
+        """
+        with self._flush_lock:
+            with self._lock:
+                for key in keys:
+                    self._pending.pop(key, None)
+
+    # ---------- lectures ----------
+
+    def pending_for(self, jury_id: int, categorie_id: int) -> dict[tuple, dict]:
+        """Notes non encore visibles en base d'un jury dans une catégorie : {(candidat, critère): valeur}"""
+        with self._lock:
+            merged = {**self._inflight, **self._pending}
+        return {
+            (candidat_id, critere_id): value
+            for (candidat_id, j, critere_id), value in merged.items()
+            if j == jury_id and value["categorie_id"] == categorie_id
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "pending": len(self._pending),
+                "inflight": len(self._inflight),
+                "accepted": self.accepted,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "dropped": self.dropped,
+                "max_entries": self.max_entries,
+                "flush_interval_ms": self.flush_interval * 1000,
+            }
+
+    # ---------- flush ----------
+
+    def flush(self, match: Optional[Callable[[tuple, dict], bool]] = None) -> int:
+        """
+        Écrit les entrées en attente (toutes, ou celles pour lesquelles match(clé, valeur)
+        est vrai) ; retourne le nombre de notes écrites.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if match is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {k: v for k, v in self._pending.items() if match(k, v)}
+                    for key in batch:
+                        del self._pending[key]
+                self._inflight = batch
+            if not batch:
+                return 0
+            try:
+                written = self._write(batch)
+            finally:
+                with self._lock:
+                    self._inflight = {}
+            return written
+
+    def _write(self, batch: dict[tuple, dict]) -> int:
+        groups = defaultdict(list)
+        for (candidat_id, jury_id, critere_id), value in batch.items():
+            groups[(candidat_id, jury_id, value["categorie_id"])].append({
+                "critere_id": critere_id, "note": value["note"], "commentaire": value["commentaire"],
+            })
+
+        db = database.SessionLocal()
+        written = 0
+        try:
+            try:
+                # Verrous pris dans un ordre fixe (clés triées, scores finaux en dernier),
+                # le même qu'une requête unitaire : pas d'interblocage entre un flush et l'API
+                for (candidat_id, jury_id, categorie_id), notes in sorted(groups.items()):
+                    scoring.upsert_criteria_scores(db, candidat_id, jury_id, categorie_id, notes, final=False)
+                for candidat_id, categorie_id in sorted({(c, k) for c, _, k in groups}):
+                    aggregation.refresh_final_score(db, candidat_id, categorie_id)
+                db.commit()
+                written = len(batch)
+                ok_groups = list(groups)
+            except OperationalError:
+                # base indisponible : tout repart dans le tampon pour le prochain cycle
+                db.rollback()
+                self._requeue(batch)
+                raise
+            except Exception:
+                # une note invalide ne doit pas bloquer le lot : on isole groupe par groupe
+                db.rollback()
+                ok_groups = []
+                for group, notes in sorted(groups.items()):
+                    try:
+                        scoring.upsert_criteria_scores(db, *group, notes)
+                        db.commit()
+                        ok_groups.append(group)
+                        written += len(notes)
+                    except OperationalError:
+                        db.rollback()
+                        candidat_id, jury_id, _ = group
+                        keys = [(candidat_id, jury_id, n["critere_id"]) for n in notes]
+                        self._requeue({key: batch[key] for key in keys})
+                    except Exception:
+                        db.rollback()
+                        logger.exception("Notes abandonnées pour candidat=%s jury=%s catégorie=%s", *group)
+                        with self._lock:
+                            self.dropped += len(notes)
+
+            with self._lock:
+                self.flushes += 1
+                self.rows_written += written
+
+            par_categorie = defaultdict(set)
+            for candidat_id, _, categorie_id in ok_groups:
+                par_categorie[categorie_id].add(candidat_id)
+            for categorie_id, candidat_ids in par_categorie.items():
+                leaderboard.publish_change(db, categorie_id, sorted(candidat_ids))
+        finally:
+            db.close()
+        return written
+
+    def _requeue(self, entries: dict[tuple, dict]):
+        # une valeur arrivée entre-temps est plus récente : elle l'emporte
+        with self._lock:
+            for key, value in entries.items():
+                self._pending.setdefault(key, value)
+
+
+buffer = WriteBuffer(SCORE_BUFFER_MAX, SCORE_BUFFER_FLUSH_MS / 1000) if SCORE_WRITE_BEHIND else None
@@ -4,6 +4,8 @@ const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000";
 
 const api = axios.create({
   baseURL: API_BASE,
+  // cookie rw_pin : relectures sur la base primaire juste après une écriture
+  withCredentials: true,
   headers: {
     "Content-Type": "application/json",
   },
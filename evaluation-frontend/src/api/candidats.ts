@@ -0,0 +1,14 @@
+import api from "./apiClient";
+
+export type CandidatsPage<T> = { items: T[]; total: number; nextOffset: number | null };
+
+// Recherche classée côté serveur (préfixe puis approximative), paginée par offset
+export const searchCandidats = async <T = any>(q: string, limit = 20, offset = 0): Promise<CandidatsPage<T>> => {
+  const r = await api.get("/candidats/search", { params: { q, limit, offset } });
+  const next = r.headers["x-next-offset"];
+  return {
+    items: r.data,
+    total: Number(r.headers["x-total-count"] ?? r.data.length),
+    nextOffset: next != null ? Number(next) : null,
+  };
+};
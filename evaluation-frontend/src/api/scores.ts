@@ -6,6 +6,13 @@ export const addOrUpdateCriteriaScore = async (payload: {
   return api.post("/scores/criteria-score", payload).then(r => r.data);
 };
 
+export const addCriteriaScoresBatch = async (payload: {
+  candidat_id:number; jury_id:number; categorie_id:number;
+  scores: { critere_id:number; note:number; commentaire?:string }[];
+}) => {
+  return api.post("/scores/criteria-scores/batch", payload).then(r => r.data);
+};
+
 export const getJuryScores = async (candidat_id:number, categorie_id:number) => {
   return api.get(`/scores/jury-scores/${candidat_id}/${categorie_id}`).then(r => r.data);
 };
@@ -13,3 +20,19 @@ export const getJuryScores = async (candidat_id:number, categorie_id:number) =>
 export const getFinalScoresByCategory = async (categorie_id:number) => {
   return api.get(`/scores/final_scores/${categorie_id}`).then(r => r.data);
 };
+
+export type ScoringProgress = {
+  categorie_id: number;
+  nb_criteres: number;
+  jurys: number[];
+  candidats: number[];
+  notes: number[][]; // notes[i][j] : critères notés par jurys[i] pour candidats[j]
+  termines_par_jury: number[];
+  termines_par_candidat: number[];
+  nb_termines: number;
+  nb_attendus: number;
+};
+
+export const getScoringProgress = async (categorie_id:number): Promise<ScoringProgress> => {
+  return api.get(`/scores/progress/${categorie_id}`).then(r => r.data);
+};
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import api from "../api/apiClient";
+import { searchCandidats } from "../api/candidats";
 import {
   Box,
   Typography,
@@ -42,6 +43,8 @@ export default function CandidatsPage() {
   });
   const [selectedId, setSelectedId] = useState<number | null>(null);
   const [confirmOpen, setConfirmOpen] = useState(false);
+  const [query, setQuery] = useState("");
+  const [total, setTotal] = useState<number | null>(null);
 
   const [form, setForm] = useState({
     nom: "",
@@ -51,11 +54,18 @@ export default function CandidatsPage() {
     projet: "",
   });
 
-  // Charger la liste
-  const fetchCandidats = async () => {
+  // Charger la liste (recherche côté serveur dès qu'un terme est saisi)
+  const fetchCandidats = async (q = query) => {
     try {
-      const res = await api.get("/candidats/");
-      setCandidats(res.data);
+      if (q.trim()) {
+        const page = await searchCandidats<Candidat>(q.trim(), 50);
+        setCandidats(page.items);
+        setTotal(page.total);
+      } else {
+        const res = await api.get("/candidats/");
+        setCandidats(res.data);
+        setTotal(null);
+      }
     } catch (err: any) {
       setError(err?.response?.data?.detail || "Erreur de chargement");
     } finally {
@@ -64,8 +74,10 @@ export default function CandidatsPage() {
   };
 
   useEffect(() => {
-    fetchCandidats();
-  }, []);
+    // petite temporisation : une requête par pause de frappe, pas par touche
+    const timer = setTimeout(() => fetchCandidats(query), query ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [query]);
 
   // Ajouter un candidat
   const handleSubmit = async (e: React.FormEvent) => {
@@ -151,6 +163,16 @@ export default function CandidatsPage() {
         </Box>
       </Paper>
 
+      {/* Recherche */}
+      <TextField
+        label="Rechercher (nom, prénom, email, projet, entreprise)"
+        value={query}
+        onChange={(e) => setQuery(e.target.value)}
+        fullWidth
+        sx={{ mb: 2 }}
+        helperText={total !== null ? `${total} résultat(s)${total > candidats.length ? `, ${candidats.length} affichés` : ""}` : " "}
+      />
+
       {/* Tableau */}
       <Paper>
         {candidats.length === 0 ? (
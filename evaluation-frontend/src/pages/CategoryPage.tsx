@@ -49,15 +49,16 @@ export default function CategoryPage() {
 
   const fetchAll = async () => {
     try {
-      const [catRes, candRes, userRes] = await Promise.all([
+      const [catRes, candRes, userRes, assignRes] = await Promise.all([
         api.get("/categories/"),
         api.get("/candidats/"),
         api.get("/users/"),
+        api.get("/categories/assignments"),
       ]);
       setCategories(catRes.data);
       setCandidats(candRes.data);
       setJurys(userRes.data.filter((u: any) => u.role === "jury"));
-      for (const cat of catRes.data) await fetchAssignations(cat.id);
+      setAssignations(assignRes.data);
     } catch {
       showMessage("Erreur de chargement des données", "error");
     } finally {
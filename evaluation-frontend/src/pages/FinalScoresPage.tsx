@@ -14,6 +14,8 @@ import type { GridColDef } from "@mui/x-data-grid";
 import EmojiEventsIcon from "@mui/icons-material/EmojiEvents";
 import api from "../api/apiClient";
 
+const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000";
+
 type Category = {
   id: number;
   nom: string;
@@ -57,27 +59,43 @@ export default function FinalScoresPage() {
     fetchCategories();
   }, []);
 
+  // Classement trié + rang à partir des lignes brutes
+  const rankScores = (rows: any[]) =>
+    [...rows]
+      .sort((a: any, b: any) => b.note_finale - a.note_finale)
+      .map((s: any, i: number) => ({
+        ...s,
+        id: s.candidat_id,
+        classement: i + 1,
+      }));
+
+  // Flux SSE : instantané initial puis seulement les lignes modifiées
   useEffect(() => {
     if (!selectedCat) return;
-    const fetchScores = async () => {
-      setLoading(true);
-      try {
-        const res = await api.get(`/scores/final_scores/${selectedCat}`);
-        const sorted = res.data
-          .sort((a: any, b: any) => b.note_finale - a.note_finale)
-          .map((s: any, i: number) => ({
-            ...s,
-            id: s.candidat_id,
-            classement: i + 1,
-          }));
-        setScores(sorted);
-      } catch {
+    setLoading(true);
+    const source = new EventSource(`${API_BASE}/scores/final_scores/${selectedCat}/stream`);
+
+    source.addEventListener("snapshot", (e) => {
+      setScores(rankScores(JSON.parse((e as MessageEvent).data)));
+      setLoading(false);
+    });
+    source.addEventListener("update", (e) => {
+      const { lignes, supprimes } = JSON.parse((e as MessageEvent).data);
+      setScores((prev) => {
+        const byId = new Map(prev.map((s) => [s.candidat_id, s]));
+        for (const id of supprimes) byId.delete(id);
+        for (const l of lignes) byId.set(l.candidat_id, l);
+        return rankScores(Array.from(byId.values()));
+      });
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
         showMessage("Erreur de chargement des scores finaux", "error");
-      } finally {
         setLoading(false);
       }
     };
-    fetchScores();
+
+    return () => source.close();
   }, [selectedCat]);
 
   const columns: GridColDef[] = [
@@ -191,6 +209,8 @@ export default function FinalScoresPage() {
 // import React, { useEffect, useState } from "react";
 // import api from "../api/apiClient";
 
+const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000";
+
 // type Category = {
 //   id: number;
 //   nom: string;
@@ -112,6 +112,38 @@ export default function ScoreEntryPage() {
     }
   };
 
+  // Enregistrement de toutes les notes d’un candidat en une seule requête
+  const saveAllScores = async (candId: number) => {
+    if (!selectedCat || !user) return;
+    const scores = criteres
+      .map((crit) => ({ critere_id: crit.id, data: notes[`${candId}-${crit.id}`] }))
+      .filter(({ data }) => data?.note || data?.note === 0)
+      .map(({ critere_id, data }) => ({
+        critere_id,
+        note: data.note,
+        commentaire: data.commentaire || "",
+      }));
+    if (scores.length === 0) {
+      showMessage("Veuillez entrer au moins une note avant d’enregistrer", "error");
+      return;
+    }
+
+    setLoading(true);
+    try {
+      const res = await api.post("/scores/criteria-scores/batch", {
+        candidat_id: candId,
+        jury_id: user.user_id,
+        categorie_id: selectedCat,
+        scores,
+      });
+      showMessage(`Notes enregistrées ✅ (${res.data.created} créées, ${res.data.updated} mises à jour)`);
+    } catch (err: any) {
+      showMessage(err?.response?.data?.detail || "Erreur d’enregistrement", "error");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   return (
     <Box p={4}>
       <Typography variant="h4" gutterBottom>
@@ -170,6 +202,14 @@ export default function ScoreEntryPage() {
                         <Typography fontWeight="bold">
                           {cand.prenom} {cand.nom}
                         </Typography>
+                        <Button
+                          variant="outlined"
+                          size="small"
+                          sx={{ mt: 1 }}
+                          onClick={() => saveAllScores(cand.id)}
+                        >
+                          Tout enregistrer
+                        </Button>
                       </TableCell>
                       {criteres.map((crit) => {
                         const key = `${cand.id}-${crit.id}`;